@@ -10,6 +10,14 @@ from discord.ext import commands
 import pretty_help
 
 from cogs.helpers import views
+from utils.database.db import DatabaseManager as db
+from utils.database.async_db import AsyncDatabaseManager as adb
+from utils.database.migrate import MigrationManager
+from utils.database.store import TicketStore
+from utils.background import ActivityTracker, AutoCloseScheduler, UpdateOnlineHelpers
+from utils.api import APIClient
+from utils.resolver import GuildResolver
+from utils.channel_pool import TicketChannelPool
 from utils.logging_setup import start_logging
 
 start_logging('tickets.log')
@@ -83,6 +91,18 @@ You can also type {BOT_PREFIX[0]}help category for more info on a category"
             views.setup(self)
             self.persistent_views_added = True
             log.info("Loaded all views")
+        if not TicketStore.loaded:
+            n_tickets = await adb.load_ticket_store()
+            log.info(f"Loaded {n_tickets} tickets")
+            await ActivityTracker.sync_from_channels(self)
+            await ActivityTracker.flush()
+        GuildResolver.clear()  # a reconnect may have replaced every cached object
+        APIClient.session()
+        n_scheduled = await AutoCloseScheduler.start(self)
+        log.info(f"Scheduled autoclose for {n_scheduled} tickets")
+        UpdateOnlineHelpers.load(self)
+        if TicketChannelPool.enabled():
+            log.info(f"Adopted {TicketChannelPool.start(self)} parked ticket channels")
         log.info(f"Logged in as {self.user.name}")
         log.info(f"discord.py API version: {discord.__version__}")
         log.info(f"Python version: {platform.python_version()}")
@@ -90,11 +110,53 @@ You can also type {BOT_PREFIX[0]}help category for more info on a category"
             f"Running on: {platform.system()} {platform.release()} ({os.name})")
         log.info("-------------------")
 
+    async def close(self):
+        AutoCloseScheduler.stop()
+        TicketChannelPool.stop()
+        await super().close()
+        await APIClient.close()
+        await ActivityTracker.flush()
+        adb.shutdown()
+        db.close()
+
     async def on_message(self, message):
+        ActivityTracker.record(message)
         if message.author == self.user or message.author.bot or not message.guild:
             return
         await self.process_commands(message)
 
+    async def on_presence_update(self, before, after):
+        if before.status != after.status:
+            UpdateOnlineHelpers.member_changed(self, after)
+
+    async def on_member_update(self, before, after):
+        if before.roles != after.roles:
+            UpdateOnlineHelpers.member_changed(self, after)
+
+    async def on_member_remove(self, member):
+        UpdateOnlineHelpers.member_changed(self, member)
+
+    async def on_guild_role_create(self, role):
+        GuildResolver.roles_changed(role.guild)
+
+    async def on_guild_role_delete(self, role):
+        GuildResolver.roles_changed(role.guild)
+
+    async def on_guild_role_update(self, before, after):
+        GuildResolver.roles_changed(after.guild)
+
+    async def on_guild_channel_create(self, channel):
+        GuildResolver.channel_changed(channel)
+
+    async def on_guild_channel_delete(self, channel):
+        GuildResolver.channel_changed(channel)
+
+    async def on_guild_channel_update(self, before, after):
+        GuildResolver.channel_changed(after, before)
+
+    async def on_guild_remove(self, guild):
+        GuildResolver.guild_removed(guild)
+
     async def on_command_completion(self, ctx):
         full_command_name = ctx.command.qualified_name
         split = full_command_name.split(" ")
@@ -144,6 +206,7 @@ You can also type {BOT_PREFIX[0]}help category for more info on a category"
 
 def run_bot():
     token = env.str("DISCORD_TOKEN")
+    MigrationManager.run()
     instance = TicketBot.create()
 
     instance.run(token)
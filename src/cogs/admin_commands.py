@@ -3,6 +3,7 @@ import logging
 from discord.ext import commands
 
 import config
+from utils.jobs import JobRunner
 from utils.utility import UI
 
 log = logging.getLogger(__name__)
@@ -35,6 +36,23 @@ class Admin(commands.Cog):
     async def shutdown_error(self, ctx, error):
         await ctx.channel.send("you're not an owner :cry:")
 
+    @commands.command(name="jobs")
+    @commands.has_role(config.roles['admin'])
+    async def jobs(self, ctx):
+        """shows the recent runs of the background jobs"""
+        embed = UI.Embed(title="Background jobs")
+        for name, runs in sorted(JobRunner.history.items()):
+            last = runs[-1]
+            average = sum(run.duration for run in runs) / len(runs)
+            failed = sum(run.outcome != "ok" for run in runs)
+            embed.add_field(name=f"{name}{' (running)' if JobRunner.is_running(name) else ''}", value=(
+                f"last: {last.started_at:%Y-%m-%d %H:%M} UTC, {last.duration:.1f}s, {last.outcome}\n"
+                f"last {len(runs)} runs: {average:.1f}s average, {failed} failed\n"
+                f"coalesced: {JobRunner.coalesced[name]}"), inline=False)
+        if not JobRunner.history:
+            embed.description = "No jobs have run yet"
+        await ctx.channel.send(embed=embed)
+
     async def cog_command_error(self, ctx, error):
         if isinstance(error, commands.MissingPermissions):
             await ctx.send("You can't do that")
@@ -3,15 +3,15 @@ import logging
 
 import discord
 from discord.ext import commands
-from discord.utils import get
 
 import cogs.helpers.views.action_views as action_views
 from cogs.helpers.views import command_views
 import cogs.helpers.actions as actions
 
 from utils.database.db import DatabaseManager as db
-from utils.background import UpdateOnlineHelpers
+from utils.background import AutoCloseScheduler, UpdateOnlineHelpers
 from utils.utility import Utility, UI
+from utils.resolver import GuildResolver
 from utils import exceptions, types
 
 import config
@@ -28,8 +28,7 @@ class TicketCommands(commands.Cog):
     @commands.has_role(config.roles['admin'])
     async def ticket(self, ctx: commands.Context):
         """shows a ticket message"""
-        bot_commands: discord.TextChannel = get(
-            ctx.guild.text_channels, name="bot-commands")
+        bot_commands: discord.TextChannel = GuildResolver.text_channel(ctx.guild, "bot-commands")
         embed = UI.Embed(title="Ticket System", timestamp=None)
         embed.add_field(name="How do I make a ticket?",
                         value=f"Either react to the message below, or type `$create {{help, submit, misc}}` in {bot_commands.mention}. (Note `$create` defaults to help)")
@@ -65,7 +64,7 @@ For help tickets:
         if ticket_type not in {'help', 'submit', 'misc'}:
             await ctx.channel.send("possible ticket types are help, submit, and misc")
             return
-        admin = get(ctx.guild.roles, name=config.roles['admin'])
+        admin = GuildResolver.role(ctx.guild, 'admin')
         if admin not in ctx.author.roles:
             member = ctx.author
             create_ticket = actions.CreateTicket(self.bot,
@@ -95,7 +94,7 @@ For help tickets:
             await ctx.channel.send(embed=embed)
             return
 
-        admin = get(ctx.guild.roles, name=config.roles['admin'])
+        admin = GuildResolver.role(ctx.guild, 'admin')
         if admin in member.roles:
             embed = UI.Embed(description=f"User {member.name} is an admin")
             await ctx.channel.send(embed=embed)
@@ -114,7 +113,7 @@ For help tickets:
                 description=f"User {member.name} not in channel")
             await ctx.channel.send(embed=embed)
             return
-        admin = get(ctx.guild.roles, name=config.roles['admin'])
+        admin = GuildResolver.role(ctx.guild, 'admin')
         if admin in member.roles:
             embed = UI.Embed(description=f"User {member.name} is an admin")
             await ctx.channel.send(embed=embed)
@@ -130,7 +129,7 @@ For help tickets:
         except ValueError as e:
             return await ctx.channel.send(e.args[0])
         guild = ctx.guild
-        admin = get(guild.roles, name=config.roles['admin'])
+        admin = GuildResolver.role(guild, 'admin')
         if admin in ctx.author.roles or user_id == ctx.author.id:
 
             close_ticket = actions.CloseTicket(ctx.guild, ctx.author,
@@ -183,6 +182,10 @@ For help tickets:
         else:
             db.update_check("0", channel.id)
             await ctx.channel.send(f"autoclose is now on for {ctx.channel.name}")
+        try:
+            AutoCloseScheduler.track(db.get_ticket(channel.id))
+        except ValueError:
+            pass
 
     @commands.command(name="auto_message", aliases=["am"])
     @commands.has_role(config.roles['admin'])
@@ -1,28 +1,31 @@
-import json
 import os
+import time
 import asyncio
 import collections
+from datetime import datetime, timezone
 import logging
-from typing import List, Set, Tuple, Union, Optional
+from typing import Any, Awaitable, Dict, List, Set, Tuple, Union, Optional
 
 import discord
 from discord.ext import commands
-from discord.utils import get
 import humanize
 
 import cogs.helpers.views.action_views as action_views
 import config
 
-from utils.database.db import DatabaseManager as db
-from utils.utility import Utility, UI, Challenge
+from utils.database.async_db import AsyncDatabaseManager as adb
+from utils.utility import Utility, UI, Challenge, Ticket
 from utils.options import Options
-from utils.background import ScrapeChallenges
+from utils.resolver import GuildResolver
+from utils.channel_pool import TicketChannelPool
+from utils.background import AutoCloseScheduler, ScrapeChallenges
 from utils import exceptions, types
 
 log = logging.getLogger(__name__)
 
 class BaseActions:
     """Base class for all actions"""
+    _category_locks: "collections.defaultdict[Tuple[int, str], asyncio.Lock]" = collections.defaultdict(asyncio.Lock)
 
     def __init__(self, guild: discord.Guild, user: Union[discord.User, discord.ClientUser],
                  channel: discord.TextChannel, bot: bool = False):
@@ -58,22 +61,13 @@ class BaseActions:
         -------
         `discord.CategoryChannel` : The category
         """
-        category = get(self.guild.categories, name=category_name)
-        if category is None:
-            new_category = await self.guild.create_category(name=category_name)
-            category = self.guild.get_channel(new_category.id)
+        async with self._category_locks[(self.guild.id, category_name)]:
+            category = GuildResolver.category(self.guild, category_name)
+            if category is None:
+                new_category = await self.guild.create_category(name=category_name)
+                category = self.guild.get_channel(new_category.id)
         return category
 
-    async def _ticket_information(self):
-        number = db.get_number_previous(self.channel_id)
-        current_type = db.get_ticket_type(self.channel_id)
-        try:
-            user_id = db.get_user_id(self.channel_id)
-        except ValueError as e:
-            return await self.channel.send(e.args[0])
-        user = self.guild.get_member(user_id)
-
-        return number, current_type, user_id, user
 class CreateTicket(BaseActions):
     def __init__(self, bot: commands.Bot, ticket_type: types.TicketType, interaction: Optional[discord.Interaction], *args, **kwargs):
         self.bot = bot
@@ -85,11 +79,13 @@ class CreateTicket(BaseActions):
             self.send_pm = lambda m: self.user.send(m)
 
         self.ticket_channel: discord.TextChannel = None
+        self.number: int = None
+        self.pending_name: Optional[str] = None  # name of a parked help ticket, set with its topic
         self._args = [interaction, args, kwargs]
         super().__init__(*args, **kwargs)
 
     async def _setup(self):
-        admin = get(self.guild.roles, name=config.roles['admin'])
+        admin = GuildResolver.role(self.guild, 'admin')
         member = self.guild.get_member(self.user_id)
         if admin not in member.roles:
             await self._maximum_tickets()
@@ -100,7 +96,7 @@ class CreateTicket(BaseActions):
 
     async def _maximum_tickets(self):
         try:
-            n_tickets = db.get_user_open_tickets(
+            n_tickets = await adb.get_user_open_tickets(
                 self.ticket_type, self.user_id)
         except ValueError as e:
             return await self.channel.send(e.args[0])
@@ -110,36 +106,29 @@ class CreateTicket(BaseActions):
             raise exceptions.MaxUserTicketError
 
     async def _create_ticket_channel(self) -> discord.TextChannel:
-        number = db.get_number_new(self.ticket_type, self.guild.id)
+        self.number = await adb.next_ticket_number(self.ticket_type, self.guild.id)
         channel_name = Options.name_open(
-            self.ticket_type, number, self.user)
+            self.ticket_type, self.number, self.user)
         cat = Options.full_category_name(self.ticket_type)
-        category = get(self.guild.categories, name=cat)
-        if category is None:
-            new_category = await self.guild.create_category(name=cat)
-            category = self.guild.get_channel(new_category.id)
+        category = await self._move_channel(cat)
         if len(category.channels) > 49:
             await self.send_pm("There are over 50 channels in the selected category. Please contact a server admin.")
             raise exceptions.MaxChannelTicketError
 
-        admin = get(self.guild.roles, name=config.roles['admin'])
-        bots = get(self.guild.roles, name=config.roles['bot'])
-        muted = get(self.guild.roles, name=config.roles['muted'])
-        quarantine = get(self.guild.roles, name=config.roles['quarantine'])
         member = self.guild.get_member(self.user_id)
+        overwrites = GuildResolver.ticket_overwrites(self.guild, member)
 
-        overwrites = {
-            self.guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            admin: discord.PermissionOverwrite(
-                read_messages=True),
-            bots: discord.PermissionOverwrite(read_messages=True),
-            member: discord.PermissionOverwrite(read_messages=True, send_messages=True),
-            muted: discord.PermissionOverwrite(
-                create_instant_invite=False, send_messages=False),
-            quarantine: discord.PermissionOverwrite(
-                view_channel=False, create_instant_invite=False, send_messages=False)
-        }
-
+        if (parked := TicketChannelPool.claim(self.guild)) is not None:
+            # help tickets edit their topic later on, renaming them then saves a name edit
+            name = None if self.ticket_type == "help" else channel_name
+            try:
+                channel = await TicketChannelPool.assign(parked, category, overwrites, name)
+            except discord.HTTPException as e:
+                log.warning(f"Couldn't use parked channel {parked}, creating one: {e}")
+            else:
+                if name is None:
+                    self.pending_name = channel_name
+                return channel
         return await category.create_text_channel(channel_name, overwrites=overwrites)
 
     async def main(self) -> discord.TextChannel:
@@ -153,14 +142,14 @@ class CreateTicket(BaseActions):
 
         status = "open"
         check = "2"
-        db.create_ticket(self.ticket_channel.id, str(
-            self.ticket_channel), self.guild.id, self.user_id, self.ticket_type, status, check)
+        await adb.create_ticket(self.ticket_channel.id, self.pending_name or str(
+            self.ticket_channel), self.guild.id, self.user_id, self.ticket_type, status, check, self.number)
 
-        avail_mods = get(
-            self.guild.roles, name=config.roles['ticket ping'])
+        avail_mods = GuildResolver.role(self.guild, 'ticket ping')
         if self.ticket_type == "help":
             helper = CreateTicketHelper(
                 self.ticket_channel, self.bot, self.ticket_type, self._args[0], *self._args[1], **self._args[2])
+            helper.pending_name = self.pending_name
             try:
                 ch_authors = await helper.challenge_selection()
             except exceptions.ChallengeTimeoutError:
@@ -187,7 +176,8 @@ class CreateTicket(BaseActions):
         await ticket_channel_message.pin()
         await self.ticket_channel.purge(limit=1)
 
-        db.update_check("0", self.ticket_channel.id)
+        await adb.update_check("0", self.ticket_channel.id)
+        AutoCloseScheduler.track(await adb.get_ticket(self.ticket_channel.id))
 
         await self._log_to_channel("Created ticket")
         log.info(
@@ -261,24 +251,30 @@ class CreateTicketHelper(CreateTicket):
             author = await UtilityActions._add_member(selected_challenge.author, selected_challenge.title, self.guild, self.ticket_channel)
             ch_authors.add(author)
 
-        if len(helpers := json.loads(selected_challenge.helper_id_list)):
-            for helper in helpers:
-                try:
-                    if db.get_helper_status(helper):
-                        await UtilityActions._add_member(int(helper), selected_challenge.title, self.guild, self.ticket_channel)
-                except ValueError:
-                    pass
+        for helper in await adb.get_helpers_for_challenge(selected_challenge.id, available_only=True):
+            await UtilityActions._add_member(int(helper), selected_challenge.title, self.guild, self.ticket_channel)
         return ch_authors  # Returns the author to be pinged on ticket creation
 
+    async def _edit_channel(self, **fields):
+        """edits the ticket channel, naming a parked one in the same request"""
+        if self.pending_name is not None:
+            fields["name"], self.pending_name = self.pending_name, None
+        if not fields:
+            return
+        edited = await self.ticket_channel.edit(**fields)
+        if edited is not None and "name" in fields:
+            await adb.update_ticket_name(str(edited), edited.id)
+
     async def challenge_selection(self) -> Set[Union[discord.Member, None]]:
         # challenges = CreateTicketHelper.fake_challenges(21)
         user_solved_challenges = await ScrapeChallenges.get_user_challenges(
             self.user_id)
         challenges = [Challenge(*list(challenge))
-                      for challenge in db.get_all_challenges() if not Challenge(*list(challenge)).id in user_solved_challenges]
+                      for challenge in await adb.get_all_challenges() if not Challenge(*list(challenge)).id in user_solved_challenges]
 
         if len(challenges) < 1:
             await self.ticket_channel.send("There are no released challenges or you have solved all the currently released challenges")
+            await self._edit_channel()
             return
 
         member = self.guild.get_member(self.user_id)
@@ -290,7 +286,7 @@ class CreateTicketHelper(CreateTicket):
         else:
             selected_challenge = await self._ask_for_challenge(await self._ask_for_category(challenges))
 
-        await self.ticket_channel.edit(topic=f"{selected_challenge.title} - {selected_challenge.author}")
+        await self._edit_channel(topic=f"{selected_challenge.title} - {selected_challenge.author}")
 
         await self.ticket_channel.set_permissions(member, read_messages=True,
                                                   send_messages=None)
@@ -351,33 +347,40 @@ class CloseTicket(BaseActions):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, *kwargs)
 
-    async def close_stats_helper(self, channel: discord.TextChannel) -> Tuple[str, str]:
+    async def close_stats_helper(self, channel: discord.TextChannel, messages: List[discord.Message],
+                                 ticket: Optional[Ticket] = None) -> Tuple[str, str]:
         """gets all the users in a channel
 
         Parameters
         ----------
         channel : `discord.TextChannel`
             channel to get users from\n
+        messages : `List[discord.Message]`
+            the channel's messages\n
+        ticket : `Optional[Ticket]`, optional
+            the channel's ticket, its creation time is used if it was recorded\n
 
         Returns
         -------
         `str`: joined list of users to count reference from channel,
-        `str`: time the channel was open
+        `str`: time the ticket was open
         """
-        users = [msg.author.name async for msg in channel.history(limit=2000).filter(lambda message: not message.author.bot)]
-
-        message_distribution = collections.Counter(users)
+        message_distribution = collections.Counter(
+            message.author.id for message in messages if not message.author.bot)
         total_messages = sum(message_distribution.values())
         if len(message_distribution) > 0:
             channel_users = []
-            for member, count in message_distribution.most_common():
+            for author_id, count in message_distribution.most_common():
                 channel_users.append(
-                    f"{self.guild.get_member_named(member).mention} ({count/total_messages:.0%})")
-            channel_users.append(f'total: {len(users)}')
+                    f"<@{author_id}> ({count/total_messages:.0%})")
+            channel_users.append(f'total: {total_messages}')
             channel_users = '\n'.join(channel_users)
         else:
             channel_users = 'No messages'
-        old = channel.created_at
+        if ticket is not None and ticket.created_at is not None:  # a parked channel is older than its ticket
+            old = datetime.fromtimestamp(ticket.created_at, tz=timezone.utc)
+        else:
+            old = channel.created_at
 
         now = discord.utils.utcnow()
         duration = now - old
@@ -388,81 +391,125 @@ class CloseTicket(BaseActions):
         return channel_users, time_open
 
     async def main(self, before_message: str = ""):
-        """closes a ticket"""
+        """closes a ticket
+
+        The ticket is closed right away (permissions, category, name and status).
+        Then its history is fetched once and turned into the transcript and the
+        message statistics concurrently, and the results are sent to the user,
+        the ticket and the logs at the same time.
+
+        Parameters
+        ----------
+        before_message : `str`, optional
+            message sent to the user along with the stats, by default ""\n
+        """
         try:
-            current_status = db.get_status(self.channel_id)
+            ticket = await adb.get_ticket(self.channel_id)
         except ValueError as e:
             return await self.channel.send(e.args[0])
 
-        if current_status == "closed":
+        if ticket.status == "closed":
             await self.channel.send("Channel is already closed")
             return
 
-        close_stats_embed = UI.Embed()
-        close_stats_embed.set_author(
-            name=f"{self.user}", icon_url=f"{self.user.avatar.url}")
-        embed_message = await self.channel.send(embed=close_stats_embed)
-
-        t_number, t_current_type, t_user_id, t_user = await self._ticket_information()
-
-        member = self.guild.get_member(t_user_id)
-        await self.channel.set_permissions(member, read_messages=None)
-
-        category = await self._move_channel("Closed Tickets")
-
-        closed_name = Options.name_close(
-            t_current_type, count=t_number, user=t_user)
-        await self.channel.edit(name=closed_name, category=category)
-
-        db.update_ticket_name(closed_name, self.channel_id)
-
-        channel_log_category = get(
-            self.guild.categories, name=config.logs["category"])
+        channel_log_category = GuildResolver.category(self.guild, config.logs["category"])
         if channel_log_category is None:
             await self.channel.send("logs category does not exist")
             return
-        channel_log = get(
-            self.guild.text_channels, category=channel_log_category, name=config.logs["name"])
+        channel_log = GuildResolver.text_channel(self.guild, config.logs["name"], channel_log_category)
         if channel_log is None:
             await self.channel.send(f"{config.logs['name']} channel does not exist in category logs")
             return
 
-        transcript_message, transcript_file = await Utility.transcript(self.channel, channel_log)
+        timings = {}
+        close_stats_embed = UI.Embed()
+        close_stats_embed.set_author(
+            name=f"{self.user}", icon_url=f"{self.user.avatar.url}")
+        t_user = self.guild.get_member(ticket.user_id)
+
+        embed_message, _ = await asyncio.gather(
+            self._timed(timings, "message", self.channel.send(embed=close_stats_embed)),
+            self._timed(timings, "close", self._close_channel(ticket, t_user)))
+
+        messages = await self._timed(timings, "history", self._collect_messages())
+        (transcript_message, transcript_file), (channel_users, time_open) = await asyncio.gather(
+            self._timed(timings, "transcript", self._transcript(channel_log, messages)),
+            self._timed(timings, "stats", self.close_stats_helper(self.channel, messages, ticket)))
+
         if transcript_message:
             close_stats_embed.add_field(name="transcript",
                                         value=f"[transcript url]({config.transcript['domain']}/transcript?link={transcript_message.attachments[0].url} \"oreos taste good dont they\") ")
         else:
             close_stats_embed.add_field(
                 name="transcript", value="transcript could not be sent to DMs")
-        await embed_message.edit(embed=close_stats_embed)
-
-        channel_users, time_open = await self.close_stats_helper(self.channel)
-
         close_stats_embed.add_field(
             name="message distribution", value=f"{channel_users}")
         close_stats_embed.add_field(
             name="time open", value=f"{time_open}")
-        if before_message:
-            if isinstance(before_message, str):
-                await t_user.send(before_message, embed=close_stats_embed, file=transcript_file)
-            else:
-                log.warning(
-                    f"object {before_message} is not of type string, but type {type(before_message)}")
-                await t_user.send(embed=close_stats_embed, file=transcript_file)
+
+        log_embed = close_stats_embed.copy()
+        log_embed.title = "Closed ticket"
+        log_embed.set_footer(text=f"{self.channel}")
+        results = await asyncio.gather(
+            self._timed(timings, "dm", self._send_to_user(t_user, before_message, close_stats_embed.copy(), transcript_file)),
+            self._timed(timings, "ticket message", embed_message.edit(embed=close_stats_embed, view=action_views.ReopenDeleteView())),
+            self._timed(timings, "log", channel_log.send(embed=log_embed)),
+            return_exceptions=True)
+        for stage, result in zip(("dm", "ticket message", "log"), results):
+            if isinstance(result, Exception):
+                log.error(f"Closing {self.channel} failed at the {stage} stage", exc_info=result)
+
+        stages = ', '.join(f"{stage} {duration:.1f}s" for stage, duration in timings.items())
+        log.info(
+            f"[CLOSED] {self.channel} by {self.user} (ID: {self.channel_id}) - {stages}")
+
+    async def _close_channel(self, ticket: Ticket, t_user: Optional[discord.Member]):
+        """hides the ticket from its owner, moves it to the closed category and marks it closed"""
+        if t_user is not None:
+            closed_name = Options.name_close(
+                ticket.t_type, count=ticket.number, user=t_user)
+        else:  # the owner left the guild, their name is only in the open ticket's name
+            closed_name = f"{ticket.channel_name}-closed"
+
+        async def move():
+            category = await self._move_channel("Closed Tickets")
+            await self.channel.edit(name=closed_name, category=category)
+
+        if t_user is not None:
+            await asyncio.gather(self.channel.set_permissions(t_user, read_messages=None), move())
         else:
-            await t_user.send(embed=close_stats_embed, file=transcript_file)
-        await embed_message.edit(embed=close_stats_embed, view=action_views.ReopenDeleteView())
+            await move()
+        await adb.update_ticket_name(closed_name, self.channel_id)
+        await adb.update_status("closed", self.channel_id)
 
-        status = "closed"
-        db.update_status(status, self.channel_id,)
+    async def _collect_messages(self) -> List[discord.Message]:
+        """fetches the whole history of the ticket once, newest first, for both the transcript and the stats"""
+        return [message async for message in self.channel.history(limit=None)]
 
-        channel_log = get(
-            self.guild.text_channels, name=config.logs['name'])
-        close_stats_embed.title = "Closed ticket"
-        close_stats_embed.set_footer(text=f"{self.channel}")
-        await channel_log.send(embed=close_stats_embed)
-        log.info(
-            f"[CLOSED] {self.channel} by {self.user} (ID: {self.channel_id})")
+    async def _transcript(self, channel_log: discord.TextChannel,
+                          messages: List[discord.Message]) -> Tuple[Optional[discord.Message], Optional[discord.File]]:
+        return await Utility.transcript(self.channel, channel_log, messages) or (None, None)
+
+    @staticmethod
+    async def _send_to_user(t_user: Optional[discord.Member], before_message: str,
+                            embed: discord.Embed, transcript_file: Optional[discord.File]):
+        if t_user is None:
+            return
+        if before_message:
+            if isinstance(before_message, str):
+                await t_user.send(before_message, embed=embed, file=transcript_file)
+                return
+            log.warning(
+                f"object {before_message} is not of type string, but type {type(before_message)}")
+        await t_user.send(embed=embed, file=transcript_file)
+
+    @staticmethod
+    async def _timed(timings: Dict[str, float], stage: str, coro: Awaitable[Any]) -> Any:
+        start = time.monotonic()
+        try:
+            return await coro
+        finally:
+            timings[stage] = time.monotonic() - start
 
 class ReopenTicket(BaseActions):
     def __init__(self, *args, **kwargs):
@@ -471,32 +518,27 @@ class ReopenTicket(BaseActions):
     async def main(self):
         """reopens a ticket"""
         try:
-            test_status = db.get_status(self.channel_id)
+            ticket = await adb.get_ticket(self.channel_id)
         except ValueError as e:
             return await self.channel.send(e.args[0])
 
-        if test_status == "open":
+        if ticket.status == "open":
             await self.channel.send("Channel is already open")
             return
 
-        t_number, t_current_type, t_user_id, t_user = await self._ticket_information()
-
-        cat = Options.full_category_name(t_current_type)
-        category = get(self.guild.categories, name=cat)
-        if category is None:
-            new_category = await self.guild.create_category(name=cat)
-            category = self.guild.get_channel(new_category.id)
+        cat = Options.full_category_name(ticket.t_type)
+        category = await self._move_channel(cat)
 
-        member = self.guild.get_member(t_user_id)
-        await self.channel.set_permissions(member, read_messages=True)
+        t_user = self.guild.get_member(ticket.user_id)
+        await self.channel.set_permissions(t_user, read_messages=True)
 
         reopened = Options.name_open(
-            t_current_type, count=t_number, user=t_user)
+            ticket.t_type, count=ticket.number, user=t_user)
         await self.channel.edit(name=reopened, category=category)
-        db.update_ticket_name(reopened, self.channel_id)
+        await adb.update_ticket_name(reopened, self.channel_id)
 
         status = "open"
-        db.update_status(status, self.channel_id)
+        await adb.update_status(status, self.channel_id)
         reopened_embed = UI.Embed(
             description="Ticket was re-opened")
         reopened_embed.set_author(
@@ -514,7 +556,7 @@ class DeleteTicket(BaseActions):
     async def main(self):
         """deletes a ticket"""
         try:
-            db.get_channel_name(self.channel_id)
+            await adb.get_ticket(self.channel_id)
         except ValueError as e:
             return await self.channel.send(e.args[0])
 
@@ -525,9 +567,9 @@ class DeleteTicket(BaseActions):
         await asyncio.sleep(5)
         await self.channel.delete()
 
-        db.move_ticket_to_archive(self.channel_id)
+        await adb.move_ticket_to_archive(self.channel_id)
 
-        db.delete_ticket(self.channel_id)
+        await adb.delete_ticket(self.channel_id)
 
         await self._log_to_channel("Deleted ticket")
         log.info(
@@ -3,48 +3,39 @@ import logging
 from discord.ext import commands
 import aiocron
 
-from utils.background import AutoClose, ScrapeChallenges, UpdateHelpers, UpdateOnlineHelpers
-from utils import exceptions
+from utils.background import ActivityTracker, UpdateOnlineHelpers
+from utils.jobs import JobRunner
+from utils.worker import WorkerClient
 
 log = logging.getLogger(__name__)
 class Tasks(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-        # @aiocron.crontab("* * * * * */5")
-        @aiocron.crontab("0 * * * *")
-        async def start_auto_close():
-            await AutoClose.main(self.bot, hours=48)
-            # await AutoClose.main(self.bot, seconds=2)
-            log.info("Finished Task AutoClose")
+        @aiocron.crontab("* * * * * */30")
+        async def start_storing_activity():
+            await ActivityTracker.flush()
 
+        # the daily runs line up with the two-hourly one at 17:00, JobRunner keeps them from overlapping
         @aiocron.crontab("0 17 * * *")
         async def start_scraping_challenges_9():
-            await ScrapeChallenges.main(self.bot)
-            log.info("Finished Task ScrapeChallenges at 9 AM")
+            await JobRunner.run("ScrapeChallenges", lambda: WorkerClient.run_job(self.bot, "ScrapeChallenges"))
 
         @aiocron.crontab("30 17 * * *")
         async def start_scraping_challenges_9_30():
-            await ScrapeChallenges.main(self.bot)
-            log.info("Finished Task ScrapeChallenges at 9 30 AM")
+            await JobRunner.run("ScrapeChallenges", lambda: WorkerClient.run_job(self.bot, "ScrapeChallenges"))
 
         @aiocron.crontab("0 */2 * * *")
         async def start_scraping_challenges_2_hours():
-            await ScrapeChallenges.main(self.bot)
-            log.info("Finished Task ScrapeChallenges for every 2 hours")
+            await JobRunner.run("ScrapeChallenges", lambda: WorkerClient.run_job(self.bot, "ScrapeChallenges"))
 
         @aiocron.crontab("*/10 * * * *")
         async def start_adding_users():
-            try:
-                await UpdateHelpers.main(self.bot)
-            except exceptions.ChallengeDoesNotExist:
-                await ScrapeChallenges.main(self.bot)
-            log.info("Finished Task UpdateHelpers for every 10 minutes")
+            await JobRunner.run("UpdateHelpers", lambda: WorkerClient.run_job(self.bot, "UpdateHelpers"))
 
-        @aiocron.crontab("*/10 * * * *")
+        @aiocron.crontab("*/30 * * * *")
         async def start_updating_online_members():
-            await UpdateOnlineHelpers.main(self.bot)
-            log.info("Finished Task UpdateOnlineMembers for every 10 minutes")
+            await JobRunner.run("UpdateOnlineHelpers", lambda: UpdateOnlineHelpers.main(self.bot))
 
 def setup(bot):
     bot.add_cog(Tasks(bot))
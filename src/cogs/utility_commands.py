@@ -1,4 +1,3 @@
-import asyncio
 from collections import defaultdict
 import json
 import typing
@@ -11,7 +10,10 @@ from discord.utils import get
 import config
 
 from utils.database.db import DatabaseManager as db
-from utils.background import ScrapeChallenges, UpdateHelpers
+from utils.background import UpdateHelpers
+from utils.resolver import GuildResolver
+from utils.jobs import JobRunner
+from utils.worker import WorkerClient
 from utils.utility import Utility, UI, Challenge
 from utils import exceptions, types
 
@@ -160,9 +162,15 @@ class UtilityCommands(commands.Cog):
         await ctx.message.delete()
         message = await ctx.channel.send(embed=embed)
 
-        await ScrapeChallenges.main(self.bot)
+        refresh = await JobRunner.run(
+            "ScrapeChallenges", lambda: WorkerClient.run_job(self.bot, "ScrapeChallenges", force=True), jitter=0)
 
-        embed.description = "challenges refreshed"
+        if refresh is None:
+            embed.description = "refreshing challenges failed, see `$jobs`"
+        elif isinstance(refresh, dict):  # ran in the worker
+            embed.description = f"refreshing challenges failed: {refresh['error']}" if 'error' in refresh else "challenges refreshed"
+        else:
+            embed.description = f"challenges refreshed: {refresh}"
         await message.edit(embed=embed)
 
     @commands.group(name="helper", aliases=["h"], invoke_without_command=True)
@@ -225,7 +233,7 @@ class UtilityCommands(commands.Cog):
     @commands.has_role(config.roles['admin'])
     async def helper_admin(self, ctx):
         """Base helper-admin command. Shows stats on helpers."""
-        helper_role = get(ctx.guild.roles, name=config.roles['helper'])
+        helper_role = GuildResolver.role(ctx.guild, 'helper')
         if len(helper_role.members):
             helper_ids = [helper.id for helper in helper_role.members]
             db_helpers = db.get_all_helpers()
@@ -249,7 +257,7 @@ class UtilityCommands(commands.Cog):
     @commands.has_role(config.roles['admin'])
     async def helper_add(self, ctx, member: discord.Member):
         """adds a helper"""
-        helper_role = get(member.guild.roles, name=config.roles['helper'])
+        helper_role = GuildResolver.role(member.guild, 'helper')
         helper_ids = [helper.id for helper in helper_role.members]
         if member.id in helper_ids:
             embed = UI.Embed(
@@ -276,7 +284,7 @@ class UtilityCommands(commands.Cog):
     @commands.has_role(config.roles['admin'])
     async def helper_remove(self, ctx, member: discord.Member):
         """removes a helper"""
-        helper_role = get(member.guild.roles, name=config.roles['helper'])
+        helper_role = GuildResolver.role(member.guild, 'helper')
         helper_ids = [helper.id for helper in helper_role.members]
         if member.id not in helper_ids:
             embed = UI.Embed(
@@ -311,13 +319,8 @@ class UtilityCommands(commands.Cog):
         message = await ctx.channel.send(embed=embed)
         await ctx.message.delete()
 
-        try:
-            await UpdateHelpers.main(self.bot)
-        except exceptions.ChallengeDoesNotExist as e:
-            embed.description = f"challenge id {e.args[0]} does not exist. getting new challenges..."
-            await message.edit(embed=embed)
-            asyncio.sleep(2)
-            await ScrapeChallenges.main(self.bot)
+        # refreshes the challenges too if a helper solved an unknown one
+        await JobRunner.run("UpdateHelpers", lambda: WorkerClient.run_job(self.bot, "UpdateHelpers"), jitter=0)
         embed.description = "helpers refreshed"
         await message.edit(embed=embed)
 
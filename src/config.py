@@ -16,6 +16,41 @@ tickets = {"emojis": ['<:rooSupport:811702778622771232>',
                       '📩', '<:imagine:871115444856160296>']}
 # ['🚩', '📩', '🧐']
 
-api = {"base_link": "https://imaginaryctf.org/api"}
+api = {"base_link": "https://imaginaryctf.org/api",
+       "timeout": {"total": 30, "connect": 10},
+       "connector": {"limit": 20,
+                     "limit_per_host": 10,
+                     "ttl_dns_cache": 300,
+                     "keepalive_timeout": 60},
+       "rate_limit": {"rate": 5, "burst": 10},
+       "workers": 8,
+       "retries": 3,
+       "backoff": 1,
+       "solve_cache": {"ttl": 600, "maxsize": 1024},
+       "solve_mirror": {"max_age": 600, "full_resync": 24 * 60 * 60}}
 
 transcript = {"domain": "http://oreos.imaginaryctf.org:1337"}
+
+database = {"path": "utils/database/bot.db",
+            "timeout": 10,
+            "cached_statements": 256,
+            "read_workers": 4,
+            "pragmas": {"journal_mode": "WAL",
+                        "synchronous": "NORMAL",
+                        "mmap_size": 256 * 1024 * 1024,
+                        "cache_size": -16 * 1024,
+                        "temp_store": "MEMORY"}}
+
+autoclose = {"hours": 48, "concurrency": 4, "retry": 10 * 60}
+
+online_helpers = {"debounce": 15}
+
+# ScrapeChallenges also runs inside UpdateHelpers when helpers solved an unknown challenge,
+# keep its timeout below UpdateHelpers'
+jobs = {"jitter": 30, "timeout": 15 * 60, "history": 10,
+        "timeouts": {"ScrapeChallenges": 5 * 60, "UpdateHelpers": 9 * 60, "UpdateOnlineHelpers": 5 * 60}}
+
+worker = {"enabled": False, "poll_interval": 1, "keep_days": 7}
+
+channel_pool = {"enabled": False, "size": 5, "category": "ticket-pool", "name": "parked",
+                "refill_delay": 30, "max_backoff": 10 * 60, "rate": 0.2, "burst": 2}
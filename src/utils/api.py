@@ -0,0 +1,263 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import time
+import logging
+
+from environs import Env
+import aiohttp
+
+import config
+from utils.exceptions import APIRequestError
+
+log = logging.getLogger(__name__)
+
+class TokenBucket():
+    """Allows `rate` acquisitions per second on average with bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self):
+        """waits until a token is available and takes it"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class AsyncTTLCache():
+    """Caches the results of coroutines for `ttl` seconds
+
+    Concurrent lookups of a key that isn't cached share a single call of the
+    factory. Exceptions aren't cached, every waiter gets them.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._values: Dict[Hashable, Tuple[float, Any]] = {}
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+    async def get(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """gets a cached value, calling `factory` if it is missing or expired
+
+        Parameters
+        ----------
+        key : `Hashable`
+            the key\n
+        factory : `Callable[[], Awaitable[Any]]`
+            creates the value\n
+
+        Returns
+        -------
+        `Any`: the value
+        """
+        if (cached := self._values.get(key)) is not None and cached[0] > time.monotonic():
+            return cached[1]
+        if (pending := self._pending.get(key)) is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it, don't warn when there are none
+            raise
+        else:
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            del self._pending[key]
+
+    def put(self, key: Hashable, value: Any):
+        now = time.monotonic()
+        if len(self._values) >= self.maxsize:
+            self._values = {k: v for k, v in self._values.items() if v[0] > now}
+        self._values[key] = (now + self.ttl, value)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
+
+class CachedResponse(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: str
+    data: Any
+
+class APIClient():
+    """One pooled http session shared by every request to the CTF platform API
+
+    The session is opened when the bot starts (or on first use) and keeps its
+    connections alive between requests until `close` is called on shutdown.
+    Every request takes a token from a shared `TokenBucket` first, so concurrent
+    callers stay within `config.api['rate_limit']`.
+    """
+    _session: Optional[aiohttp.ClientSession] = None
+    _apikey: Optional[str] = None
+    _limiter = TokenBucket(**config.api['rate_limit'])
+    _cache: Dict[str, CachedResponse] = {}
+    cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def apikey(cls) -> str:
+        """gets the api key, reading it from the environment once
+
+        Returns
+        -------
+        `str`: the api key
+        """
+        if cls._apikey is None:
+            env = Env()
+            env.read_env()
+            cls._apikey = env.str('apikey')
+        return cls._apikey
+
+    @classmethod
+    def session(cls) -> aiohttp.ClientSession:
+        """gets the shared session, opening it if needed
+
+        Returns
+        -------
+        `aiohttp.ClientSession`: the session
+        """
+        if cls._session is None or cls._session.closed:
+            connector = aiohttp.TCPConnector(**config.api['connector'])
+            timeout = aiohttp.ClientTimeout(**config.api['timeout'])
+            cls._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            log.info("Opened API session")
+        return cls._session
+
+    @classmethod
+    async def close(cls):
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+            log.info("Closed API session")
+        cls._session = None
+
+    @classmethod
+    async def get_json(cls, path: str, params: Optional[Dict[str, Any]] = None,
+                       authenticated: bool = True, raise_errors: bool = False) -> Any:
+        """sends a GET request to the api
+
+        Parameters
+        ----------
+        path : `str`
+            endpoint relative to `config.api['base_link']`, e.g. `/challenges/released`\n
+        params : `Optional[Dict[str, Any]]`, optional
+            query parameters, by default None\n
+        authenticated : `bool`, optional
+            whether to send the api key, by default True\n
+        raise_errors : `bool`, optional
+            raise `APIRequestError` instead of returning an empty list on failure, by default False\n
+
+        Returns
+        -------
+        `Any`: the decoded json, an empty list if the request failed
+
+        Raises
+        ------
+        `APIRequestError`: the request failed and `raise_errors` is set
+        """
+        params = dict(params or {})
+        if authenticated:
+            params['apikey'] = cls.apikey()
+        await cls._limiter.acquire()
+        try:
+            async with cls.session().get(config.api['base_link'] + path, params=params) as resp:
+                if not resp.status == 200:
+                    log.warning("Fetching %s failed", path)
+                    if raise_errors:
+                        retry_after = resp.headers.get('Retry-After')
+                        raise APIRequestError(path, resp.status,
+                                              float(retry_after) if retry_after and retry_after.isdigit() else None)
+                    return []
+                return await resp.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if not raise_errors:
+                raise
+            raise APIRequestError(path) from e
+
+    @classmethod
+    async def get_json_if_changed(cls, path: str, params: Optional[Dict[str, Any]] = None,
+                                  authenticated: bool = True) -> Tuple[Any, bool]:
+        """sends a conditional GET request, remembering the ETag, Last-Modified and
+        a hash of the last successful response
+
+        Parameters
+        ----------
+        path : `str`
+            endpoint relative to `config.api['base_link']`\n
+        params : `Optional[Dict[str, Any]]`, optional
+            query parameters, by default None\n
+        authenticated : `bool`, optional
+            whether to send the api key, by default True\n
+
+        Returns
+        -------
+        `Any`: the decoded json, the cached json if it didn't change, an empty list if the request failed,
+        `bool`: whether the json changed since the last call
+        """
+        params = dict(params or {})
+        if authenticated:
+            params['apikey'] = cls.apikey()
+        cached = cls._cache.get(path)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        await cls._limiter.acquire()
+        async with cls.session().get(config.api['base_link'] + path, params=params, headers=headers) as resp:
+            if resp.status == 304 and cached is not None:
+                cls.cache_stats['hits'] += 1
+                return cached.data, False
+            if not resp.status == 200:
+                log.warning("Fetching %s failed", path)
+                return [], False
+            body = await resp.read()
+
+        digest = hashlib.sha256(body).hexdigest()
+        if cached is not None and cached.digest == digest:
+            cls.cache_stats['hits'] += 1
+            return cached.data, False
+        cls.cache_stats['misses'] += 1
+        data = json.loads(body)
+        cls._cache[path] = CachedResponse(resp.headers.get('ETag'), resp.headers.get('Last-Modified'), digest, data)
+        return data, True
+
+    @classmethod
+    def invalidate(cls, path: Optional[str] = None):
+        """forgets cached responses so the next conditional request fetches in full
+
+        Parameters
+        ----------
+        path : `Optional[str]`, optional
+            endpoint to forget, every endpoint if None\n
+        """
+        if path is None:
+            cls._cache.clear()
+        else:
+            cls._cache.pop(path, None)
@@ -4,23 +4,27 @@
 2 = channel will be ignored
 """
 
-from datetime import timedelta
-import json
-from typing import Dict, List
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+import asyncio
+import hashlib
+import heapq
+import itertools
+import random
+import time
 import logging
 
 import discord
 from discord.ext import commands
-from discord.utils import get
-from environs import Env
-import aiohttp
 
-import cogs.helpers.views.action_views as action_views
-import cogs.helpers.actions as actions
 from utils import types, exceptions
+from utils.api import APIClient, AsyncTTLCache
+from utils.resolver import GuildResolver
 from utils.options import Options
-from utils.utility import Utility, UI, Challenge
+from utils.utility import Utility, UI, AutoCloseSummary, Challenge, ChallengeRefresh, Ticket
 from utils.database.db import DatabaseManager as db
+from utils.database.async_db import AsyncDatabaseManager as adb
+from utils.database.store import TicketStore
 import config
 
 log = logging.getLogger(__name__)
@@ -28,37 +32,9 @@ log = logging.getLogger(__name__)
 class AutoClose(commands.Cog):
     """Autoclose ticket manager"""
 
-    @classmethod
-    async def get_message_time(cls, channel: discord.TextChannel):
-        """get the total time of the last message send
-
-        Parameters
-        ----------
-        channel : `str`
-            channel to get message from
-
-        Returns:
-            duration (int): duration from message creation till now
-            message: the message
-        """
-        try:
-            message_list = await channel.history(limit=1).flatten()
-            try:
-                message = message_list[0]
-            except IndexError:
-                return
-        except discord.errors.NotFound as e:
-            log.warning(e)
-            return
-        else:
-            pass
-        old = message.created_at
-        now = discord.utils.utcnow()
-        return message, now - old
-
     @classmethod
     async def old_ticket_actions(cls, bot: commands.Bot, guild: discord.Guild,
-                                 channel: discord.TextChannel, message: discord.Message):
+                                 channel: discord.TextChannel, ticket: Ticket):
         """Check if a channel is old
 
         If check is 0, send a polite message and set check to 1.
@@ -73,169 +49,666 @@ class AutoClose(commands.Cog):
             the guild\n
         channel : `discord.TextChannel`
             the channel\n
-        message : `discord.message.Message`
-            the latest message\n
+        ticket : `Ticket`
+            the channel's ticket\n
         """
-        try:
-            check = int(db.get_check(channel.id))
-        except ValueError as e:
-            log.info(e.args[0])
-            return
+        # cogs.helpers.actions imports this module, importing it at the top would be circular
+        import cogs.helpers.views.action_views as action_views
+        import cogs.helpers.actions as actions
+
+        check = int(ticket.bg_check)
         log.info(f"check: {check}- {channel}")
 
         if check == 1:
             close = actions.CloseTicket(guild, bot, channel, bot=True)
             await close.main(before_message="This ticket was automatically closed due to no response.")
-            db.update_check("0", channel.id)
+            await adb.update_check("0", channel.id)
 
         elif check == 0:
-            try:
-                user_id = db.get_user_id(channel.id)
-            except ValueError as e:
-                return log.info(e.args[0])
-            member = guild.get_member(int(user_id))
+            member = guild.get_member(int(ticket.user_id))
             message = f"If that is all we can help you with {member.mention}, please close this ticket."
             random_admin = await Utility.random_admin_member(guild)
             await Utility.say_in_webhook(bot, random_admin, channel, random_admin.avatar.url, True, message, return_message=True, view=action_views.CloseView())
             log.info(
                 f"{random_admin.name} said the auto close message in {channel.name}")
-            db.update_check("1", channel.id)
+            await adb.update_check("1", channel.id)
         else:  # ticket ignored
             pass
 
     @classmethod
-    async def main(cls, bot: commands.Bot, **kwargs):
-        """check for inactivity in a channel
+    async def main(cls, bot: commands.Bot, channel_ids: List[int]) -> AutoCloseSummary:
+        """runs the autoclose actions for tickets whose deadline has passed
+
+        Tickets are handled concurrently, at most `config.autoclose['concurrency']`
+        at a time, taking turns between guilds so one busy guild can't hold up the rest.
 
         Parameters
         ----------
         bot : `discord.commands.Bot`
-            [description]\n
+            the bot\n
+        channel_ids : `List[int]`
+            tickets that are due\n
+
+        Returns
+        -------
+        `AutoCloseSummary`: what happened to the tickets
+        """
+        start = time.monotonic()
+        await ActivityTracker.flush()
+        by_guild: Dict[int, List[Ticket]] = {}
+        for channel_id in channel_ids:
+            try:
+                ticket = await adb.get_ticket(channel_id)
+            except ValueError:
+                continue
+            by_guild.setdefault(ticket.guild_id, []).append(ticket)
+        tickets = [ticket for round_ in itertools.zip_longest(*by_guild.values())
+                   for ticket in round_ if ticket is not None]
+
+        semaphore = asyncio.Semaphore(config.autoclose['concurrency'])
+        now = discord.utils.utcnow()
+
+        async def run(ticket: Ticket) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await cls._process(bot, ticket, now)
+                except Exception as e:
+                    log.error(f"AutoClose failed for {ticket.channel_name} ({ticket.channel_id})", exc_info=e)
+                    AutoCloseScheduler.retry(ticket.channel_id)
+                    return "failed"
+
+        outcomes = await asyncio.gather(*(run(ticket) for ticket in tickets))
+        return AutoCloseSummary(checked=len(tickets), warned=outcomes.count("warned"),
+                                closed=outcomes.count("closed"), failed=outcomes.count("failed"),
+                                duration=time.monotonic() - start)
+
+    @classmethod
+    async def _process(cls, bot: commands.Bot, ticket: Ticket, now: datetime) -> Optional[str]:
+        """runs the autoclose action for a single due ticket
+
+        Returns
+        -------
+        `Optional[str]`: "warned" or "closed", None if the ticket was skipped
         """
+        if ticket.status != "open" or int(ticket.bg_check) == 2:
+            return None
+        guild = bot.get_guild(ticket.guild_id)
+        channel = guild.get_channel(ticket.channel_id) if guild else None
         cat = Options.full_category_name("help")
+        if channel is None or channel.category is None or channel.category.name != cat:
+            return None
+
+        if cls.deadline(ticket) > now:
+            AutoCloseScheduler.track(ticket)
+            return None
+        log.debug(channel.name)
+        await cls.old_ticket_actions(bot, guild, channel, ticket)
+        if int(ticket.bg_check) == 0:
+            AutoCloseScheduler.schedule(
+                ticket.channel_id, (now + cls.threshold()).timestamp())
+            return "warned"
+        return "closed"
+
+    @staticmethod
+    def threshold() -> timedelta:
+        return timedelta(hours=config.autoclose['hours'])
+
+    @classmethod
+    def deadline(cls, ticket: Ticket) -> datetime:
+        return cls.last_activity(ticket) + cls.threshold()
+
+    @staticmethod
+    def last_activity(ticket: Ticket) -> datetime:
+        """gets the time of the latest message in a ticket, falling back to the channel's creation
+
+        Parameters
+        ----------
+        ticket : `Ticket`
+            the ticket\n
+
+        Returns
+        -------
+        `datetime`: time of the latest activity
+        """
+        if ticket.last_message_at is None:
+            return discord.utils.snowflake_time(ticket.channel_id)
+        return datetime.fromtimestamp(ticket.last_message_at, tz=timezone.utc)
+
+class AutoCloseScheduler():
+    """Runs AutoClose for every ticket at the moment it has been inactive for too long
+
+    Deadlines are kept in a min-heap of `(deadline, channel_id)`. Rescheduling a
+    ticket pushes a new entry and leaves the old one in the heap; entries that no
+    longer match `_deadlines` are skipped when they are popped.
+    """
+    _heap: List[Tuple[float, int]] = []
+    _deadlines: Dict[int, float] = {}
+    _wakeup: Optional[asyncio.Event] = None
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def schedule(cls, channel_id: int, deadline: float):
+        """sets the time a ticket is due
+
+        Parameters
+        ----------
+        channel_id : `int`
+            the channel id\n
+        deadline : `float`
+            unix timestamp of when autoclose should act on the ticket\n
+        """
+        if cls._deadlines.get(channel_id) == deadline:
+            return
+        cls._deadlines[channel_id] = deadline
+        heapq.heappush(cls._heap, (deadline, channel_id))
+        if len(cls._heap) > 2 * len(cls._deadlines) + 64:
+            cls._heap = [(deadline, channel_id) for channel_id, deadline in cls._deadlines.items()]
+            heapq.heapify(cls._heap)
+        if cls._wakeup is not None and cls._heap[0] == (deadline, channel_id):
+            cls._wakeup.set()
+
+    @classmethod
+    def retry(cls, channel_id: int):
+        """schedules a ticket whose autoclose run failed again after `config.autoclose['retry']` seconds,
+        unless it was rescheduled in the meantime
+
+        Parameters
+        ----------
+        channel_id : `int`
+            the channel id\n
+        """
+        if channel_id not in cls._deadlines:
+            cls.schedule(channel_id, time.time() + config.autoclose['retry'])
+
+    @classmethod
+    def unschedule(cls, channel_id: int):
+        cls._deadlines.pop(channel_id, None)
+
+    @classmethod
+    def track(cls, ticket: Ticket):
+        """schedules a ticket if autoclose applies to it, otherwise unschedules it
+
+        Parameters
+        ----------
+        ticket : `Ticket`
+            the ticket\n
+        """
+        if (ticket.status != "open" or int(ticket.bg_check) == 2
+                or Options.full_category_name(ticket.t_type) != Options.full_category_name("help")):
+            cls.unschedule(ticket.channel_id)
+        else:
+            cls.schedule(ticket.channel_id, AutoClose.deadline(ticket).timestamp())
+
+    @classmethod
+    async def start(cls, bot: commands.Bot) -> int:
+        """schedules every autoclose candidate and starts waiting for deadlines
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+
+        Returns
+        -------
+        `int`: number of scheduled tickets
+        """
+        cls._heap, cls._deadlines = [], {}
         for guild in bot.guilds:
-            safe_tickets_list = db.get_guild_safe_tickets(guild.id)
-            category = discord.utils.get(guild.categories, name=cat)
-            if category is None:
-                return
-            channels = category.text_channels
-            for channel in channels:
-                log.debug(channel.name)
-                try:
-                    status = db.get_status(channel.id)
-                except ValueError as e:
-                    log.info(e.args[0])
-                    continue
+            for ticket in await adb.get_autoclose_candidates(guild.id):
+                cls.track(ticket)
+        if cls._task is None or cls._task.done():
+            cls._wakeup = asyncio.Event()
+            cls._task = asyncio.create_task(cls._run(bot))
+        else:
+            cls._wakeup.set()
+        return len(cls._deadlines)
 
-                if channel.id in safe_tickets_list or status == "closed" or status is None:
-                    continue
+    @classmethod
+    def stop(cls):
+        if cls._task is not None:
+            cls._task.cancel()
+            cls._task = None
+
+    @classmethod
+    def _pop_due(cls, now: float) -> List[int]:
+        due = []
+        while cls._heap and cls._heap[0][0] <= now:
+            deadline, channel_id = heapq.heappop(cls._heap)
+            if cls._deadlines.get(channel_id) == deadline:
+                del cls._deadlines[channel_id]
+                due.append(channel_id)
+        return due
 
+    @classmethod
+    async def _run(cls, bot: commands.Bot):
+        while True:
+            cls._wakeup.clear()
+            due = cls._pop_due(time.time())
+            if due:
                 try:
-                    message, duration = await cls.get_message_time(channel)
-                except:
-                    continue
+                    summary = await AutoClose.main(bot, due)
+                except Exception as e:
+                    log.exception(e)
+                    for channel_id in due:
+                        cls.retry(channel_id)
+                else:
+                    log.info(f"Finished AutoClose: {summary}")
+                continue
+            timeout = cls._heap[0][0] - time.time() if cls._heap else None
+            try:
+                await asyncio.wait_for(cls._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
 
-                if duration < timedelta(**kwargs):
-                    try:
-                        check = int(db.get_check(channel.id))
-                    except ValueError as e:
-                        log.info(e.args[0])
-                        continue
+class ActivityTracker():
+    """Buffers the latest message of every ticket and writes them to the database in batches"""
+    _pending: Dict[int, Tuple[float, bool]] = {}
+
+    @classmethod
+    def record(cls, message: discord.Message):
+        """remembers a message if it was sent in a ticket
+
+        Runs for every message, so it only looks at the `TicketStore`. Messages
+        sent before the store is loaded are picked up by `sync_from_channels`.
 
-                    admin = discord.utils.get(
-                        guild.roles, name=config.roles['admin'])
-                    people = [member.id for member in admin.members]
+        Parameters
+        ----------
+        message : `discord.Message`
+            the message\n
+        """
+        if message.guild is None or not TicketStore.loaded or TicketStore.get(message.channel.id) is None:
+            return
+        cls._record(message.channel.id,
+                    message.created_at.timestamp(), cls.is_staff(message.guild, message.author))
 
-                    if message.author.id in people and check == 1:
-                        db.update_check("0", channel.id)
+    @staticmethod
+    def is_staff(guild: discord.Guild, author: Union[discord.Member, discord.User]) -> bool:
+        admin = GuildResolver.role(guild, 'admin')
+        return isinstance(author, discord.Member) and admin in author.roles
 
-                elif duration > timedelta(**kwargs):
-                    await cls.old_ticket_actions(bot, guild, channel, message)
+    @classmethod
+    def _record(cls, channel_id: int, timestamp: float, is_staff: bool):
+        previous = cls._pending.get(channel_id)
+        if previous is None or previous[0] <= timestamp:
+            cls._pending[channel_id] = (timestamp, is_staff)
+
+    @classmethod
+    async def sync_from_channels(cls, bot: commands.Bot):
+        """records the last message discord reports for every ticket channel,
+        catching up on messages sent while the bot was offline
+
+        The last message is fetched for tickets that had activity since, to
+        tell whether staff sent it.
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        """
+        for guild in bot.guilds:
+            for channel in guild.text_channels:
+                if channel.last_message_id is None:
+                    continue
+                if (ticket := TicketStore.get(channel.id)) is None:
+                    continue
+                timestamp = discord.utils.snowflake_time(
+                    channel.last_message_id).timestamp()
+                if ticket.last_message_at is not None and ticket.last_message_at >= timestamp:
+                    continue
+                message = channel.last_message
+                if message is None:
+                    try:
+                        message = await channel.fetch_message(channel.last_message_id)
+                    except discord.HTTPException:  # deleted, count it as the user's
+                        pass
+                cls._record(channel.id, timestamp, message is not None and cls.is_staff(guild, message.author))
+
+    @classmethod
+    async def flush(cls):
+        """writes all buffered activity to the database"""
+        if not cls._pending:
+            return
+        pending, cls._pending = cls._pending, {}
+        try:
+            await adb.update_ticket_activity([(channel_id, timestamp, is_staff)
+                                              for channel_id, (timestamp, is_staff) in pending.items()])
+        except Exception as e:
+            log.exception(e)
+            for channel_id, (timestamp, is_staff) in pending.items():
+                cls._record(channel_id, timestamp, is_staff)
+            return
+        log.debug(f"Stored activity of {len(pending)} tickets")
+
+        for channel_id, (_, is_staff) in pending.items():
+            try:
+                ticket = db.get_ticket(channel_id)
+            except ValueError:
+                continue
+            if is_staff and int(ticket.bg_check) == 1:
+                await adb.update_check("0", channel_id)
+                ticket.bg_check = 0
+            AutoCloseScheduler.track(ticket)
 
 class ScrapeChallenges():
     """Scrapes challenges"""
-    @classmethod
-    def _setup(cls) -> Dict[str, str]:
-        env = Env()
-        env.read_env()
-        return {'apikey': env.str('apikey')}
+    solve_cache = AsyncTTLCache(**config.api['solve_cache'])
 
     @classmethod
-    async def _fetch(cls, client: aiohttp.ClientSession, url: str, params=None) -> Dict[str, str]:
-        async with client.get(url, params=params) as resp:
-            if not resp.status == 200:
-                log.warning("Fetching %s failed", url)
-                return []
-            return await resp.json()
+    async def fetch_challenges(cls) -> Tuple[List[Dict[str, str]], bool]:
+        return await APIClient.get_json_if_changed('/challenges/released')
 
     @classmethod
-    async def fetch_challenges(cls):
-        params = cls._setup()
-        async with aiohttp.ClientSession() as session:
-            return await cls._fetch(session, config.api["base_link"] +
-                                    '/challenges/released', params=params)
+    async def main(cls, bot: commands.Bot, force: bool = False) -> ChallengeRefresh:
+        """refreshes the challenges table and the helpers' solves if challenges were added
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        force : `bool`, optional
+            refresh even if the challenges didn't change, by default False\n
+
+        Returns
+        -------
+        `ChallengeRefresh`: the changes that were made
+        """
+        refresh = await cls.refresh(force)
+        if refresh.added:
+            await UpdateHelpers.main(bot)
+        return refresh
 
     @classmethod
-    async def main(cls, bot: commands.Bot) -> None:
-        challenges = await cls.fetch_challenges()
+    async def refresh(cls, force: bool = False) -> ChallengeRefresh:
+        """refreshes the challenges table, unless the api reports the same challenges as last time
+
+        Parameters
+        ----------
+        force : `bool`, optional
+            refresh even if the challenges didn't change, by default False\n
+
+        Returns
+        -------
+        `ChallengeRefresh`: the changes that were made
+        """
+        if force:
+            APIClient.invalidate('/challenges/released')
+        challenges, changed = await cls.fetch_challenges()
+        if not challenges:
+            log.warning("No challenges were fetched, keeping the current challenges")
+            return ChallengeRefresh([], [], [])
+        if not changed:
+            log.info(f"Released challenges are unchanged, skipping refresh (cache {APIClient.cache_stats})")
+            return ChallengeRefresh([], [], [])
         all_challenges = []
         for challenge in challenges:
             ignore = bool(challenge['author'] == config.roles['admin'])
             all_challenges.append(Challenge(
                 challenge["id"], challenge["title"], challenge["author"], challenge["category"].split(",")[0], ignore))
 
-        db.refresh_database_ch(all_challenges)
-        await UpdateHelpers.main(bot)
+        refresh = await adb.refresh_database_ch(all_challenges)
+        if refresh is None:  # forget the response so the next run doesn't skip it as unchanged
+            APIClient.invalidate('/challenges/released')
+            return ChallengeRefresh([], [], [])
+        log.info(f"Refreshed challenges: {refresh}")
+        if refresh.changed:
+            cls.solve_cache.invalidate()
+        return refresh
 
     @classmethod
-    async def get_user_challenges(cls, discord_id: int) -> List[int]:
-        params = cls._setup()
-        async with aiohttp.ClientSession() as session:
-            solve_challenges = await cls._fetch(session, config.api["base_link"] +
-                                                f'/solves/bydiscordid/{discord_id}', params=params)
-            try:
-                team_id = solve_challenges[0]["team"]["id"]
-            except IndexError:  # one challenge
-                pass
-            except TypeError:  # solo player
-                pass
-            else:
-                solve_challenges = await cls._fetch(session, config.api["base_link"] +
-                                                    f'/solves/byteamid/{team_id}')
-            if not solve_challenges:
-                return []
-            return [challenge['challenge']['id'] for challenge in solve_challenges]
+    async def get_user_challenges(cls, discord_id: int, raise_errors: bool = False, refresh: bool = False) -> List[int]:
+        """gets the challenges a user (or their team) solved
+
+        Solves come from the local mirror kept by `SolveMirror`, results are
+        cached per user for `config.api['solve_cache']['ttl']` seconds.
+        Failed lookups aren't cached.
+
+        Parameters
+        ----------
+        discord_id : `int`
+            the user's discord id\n
+        raise_errors : `bool`, optional
+            raise `APIRequestError` instead of returning an empty list on failure, by default False\n
+        refresh : `bool`, optional
+            sync the user's solves now and store the fresh result, by default False\n
+
+        Returns
+        -------
+        `List[int]`: ids of the solved challenges
+        """
+        if refresh:
+            cls.solve_cache.invalidate(("user", discord_id))
+        try:
+            return await cls.solve_cache.get(("user", discord_id),
+                                             lambda: SolveMirror.challenges(discord_id, refresh))
+        except exceptions.APIRequestError:
+            if raise_errors:
+                raise
+            return []
+
+class SolveMirror():
+    """Keeps the local solves table in sync with the platform
+
+    Every solo player and team has a cursor, the newest solve id stored for it.
+    Syncs send it as `since` and only store solves newer than it, so nothing is
+    rewritten whether or not the api filters by it. A full resync replaces the
+    stored solves when there is no cursor, the solves have no ids, or
+    `config.api['solve_mirror']['full_resync']` seconds have passed.
+    """
+    _syncs: Dict[Tuple[bool, int], asyncio.Task] = {}
+
+    @classmethod
+    async def challenges(cls, discord_id: int, refresh: bool = False) -> List[int]:
+        """gets the challenges a user solved, syncing their solves first if they are stale
+
+        Parameters
+        ----------
+        discord_id : `int`
+            the user's discord id\n
+        refresh : `bool`, optional
+            sync even if the stored solves are recent, by default False\n
+
+        Returns
+        -------
+        `List[int]`: ids of the solved challenges
+
+        Raises
+        ------
+        `APIRequestError`: syncing failed
+        """
+        now = time.time()
+        solver = await adb.get_solver(discord_id)
+        if solver is None or now - solver['resolved_at'] > config.api['solve_mirror']['full_resync']:
+            team_id, synced = await cls._resolve(discord_id)
+        else:
+            team_id, synced = solver['team_id'], False
+
+        is_team, owner_id = (True, team_id) if team_id is not None else (False, discord_id)
+        cursor = await adb.get_solve_cursor(is_team, owner_id)
+        if not synced and (refresh or cursor is None or now - cursor['synced_at'] > config.api['solve_mirror']['max_age']):
+            await cls._sync_once(is_team, owner_id, cursor)
+        return await adb.get_solved_challenges(discord_id)
+
+    @classmethod
+    async def _resolve(cls, discord_id: int) -> Tuple[Optional[int], bool]:
+        """looks up whether a user plays in a team, solo players' solves are stored right away
+
+        Returns
+        -------
+        `Optional[int]`: the team id, None for solo players,
+        `bool`: whether the user's solves were stored
+        """
+        solve_challenges = await APIClient.get_json(f'/solves/bydiscordid/{discord_id}', raise_errors=True)
+        try:
+            team_id = solve_challenges[0]["team"]["id"]
+        except IndexError:  # one challenge
+            team_id = None
+        except TypeError:  # solo player
+            team_id = None
+        await adb.update_solver(discord_id, team_id)
+        if team_id is not None:
+            return team_id, False
+        await adb.store_solves(False, discord_id, cls._parse(solve_challenges), full=True)
+        return None, True
+
+    @classmethod
+    async def _sync_once(cls, is_team: bool, owner_id: int, cursor: Optional[Mapping]):
+        """syncs a solo player or team, concurrent callers wait for the sync that is already running"""
+        key = (is_team, owner_id)
+        if (task := cls._syncs.get(key)) is None or task.done():
+            task = cls._syncs[key] = asyncio.create_task(cls._sync(is_team, owner_id, cursor))
+        try:
+            await asyncio.shield(task)
+        finally:
+            if task.done() and cls._syncs.get(key) is task:
+                del cls._syncs[key]
+
+    @classmethod
+    async def _sync(cls, is_team: bool, owner_id: int, cursor: Optional[Mapping]):
+        full = (cursor is None or cursor['last_solve_id'] is None
+                or time.time() - (cursor['full_synced_at'] or 0) > config.api['solve_mirror']['full_resync'])
+        params = {} if full else {'since': cursor['last_solve_id']}
+        if is_team:
+            solve_challenges = await APIClient.get_json(f'/solves/byteamid/{owner_id}', params, authenticated=False,
+                                                        raise_errors=True)
+        else:
+            solve_challenges = await APIClient.get_json(f'/solves/bydiscordid/{owner_id}', params, raise_errors=True)
+
+        solves = cls._parse(solve_challenges)
+        if any(solve_id is None for _, solve_id in solves):
+            full = True  # no ids to compare against, `since` can't have been applied either
+        elif not full:
+            solves = [solve for solve in solves if solve[1] > cursor['last_solve_id']]
+        await adb.store_solves(is_team, owner_id, solves, full=full)
+        log.debug(f"Synced {len(solves)} {'team' if is_team else 'player'} solves of {owner_id} (full: {full})")
+
+    @staticmethod
+    def _parse(solve_challenges: List[dict]) -> List[Tuple[int, Optional[int]]]:
+        return [(solve['challenge']['id'], solve.get('id')) for solve in solve_challenges or []]
 
 class UpdateHelpers():
+    @classmethod
+    async def main(cls, bot: commands.Bot):
+        """fetches the solves of every helper and stores them in one batch
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        """
+        await cls.store_solves(cls.helper_ids(bot))
+
     @staticmethod
-    async def main(bot: commands.Bot):
+    def helper_ids(bot: commands.Bot) -> Set[int]:
+        helper_ids = set()
         for guild in bot.guilds:
-            helper_role = discord.utils.get(
-                guild.roles, name=config.roles['helper'])
-            for helper in helper_role.members:
-                solved_challenge_ids = await ScrapeChallenges.get_user_challenges(
-                    helper.id)
-                for ch_id in solved_challenge_ids:
-                    db.update_helper_ch(helper.id, ch_id)
-
-    @classmethod
-    async def modify_helper_to_channel(cls, ticket_channel: discord.TextChannel, user_id: int, update: bool):
-        helper = ticket_channel.guild.get_member(user_id)
-        if helper is None:
-            return
-        if helper in ticket_channel.members:
-            if update is False:
-                await ticket_channel.set_permissions(helper, read_messages=False,
-                                                     send_messages=False)
-            else:
-                raise exceptions.HelperSyncError(
-                    "you can't be added to a channel you're already in!")
-        elif update is True:
-            await ticket_channel.set_permissions(helper, read_messages=True,
-                                                 send_messages=True)
+            helper_role = GuildResolver.role(guild, 'helper')
+            if helper_role is not None:
+                helper_ids.update(helper.id for helper in helper_role.members)
+        return helper_ids
+
+    @classmethod
+    async def store_solves(cls, helper_ids: Iterable[int]):
+        """fetches the solves of the given helpers and stores them in one batch
+
+        Up to `config.api['workers']` helpers are fetched at once, all requests
+        share the api client's rate limit.
+
+        Parameters
+        ----------
+        helper_ids : `Iterable[int]`
+            discord ids of the helpers\n
+
+        Raises
+        ------
+        `ChallengeDoesNotExist`: a helper solved a challenge that isn't stored
+        """
+        helper_ids = set(helper_ids)
+        semaphore = asyncio.Semaphore(config.api['workers'])
+
+        async def fetch(helper_id: int) -> List[int]:
+            async with semaphore:
+                return await cls.fetch_helper_solves(helper_id)
+
+        results = await asyncio.gather(*(fetch(helper_id) for helper_id in helper_ids))
+
+        missing_challenge_ids = await adb.set_helpers(helper_ids)
+        log.info(f"Synced {sum(map(len, results))} solves of {len(helper_ids)} helpers")
+        if missing_challenge_ids:
+            raise exceptions.ChallengeDoesNotExist(missing_challenge_ids[0])
+
+    @staticmethod
+    async def fetch_helper_solves(helper_id: int) -> List[int]:
+        """gets the challenges a helper solved, retrying transient failures with exponential backoff
+
+        Parameters
+        ----------
+        helper_id : `int`
+            the helper's discord id\n
+
+        Returns
+        -------
+        `List[int]`: ids of the solved challenges, empty if every attempt failed
+        """
+        retries = config.api['retries']
+        for attempt in range(retries + 1):
+            try:
+                return await ScrapeChallenges.get_user_challenges(helper_id, raise_errors=True, refresh=True)
+            except exceptions.APIRequestError as e:
+                if not e.transient or attempt == retries:
+                    log.warning(f"Giving up on solves of {helper_id}: {e}")
+                    return []
+                delay = e.retry_after or config.api['backoff'] * 2 ** attempt * random.uniform(1, 1.5)
+                log.debug(f"{e}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        return []
+
+    @staticmethod
+    def helper_overwrites(ticket_channel: discord.TextChannel, helpers: List[discord.Member],
+                          update: bool) -> Optional[Dict[Union[discord.Role, discord.Member], discord.PermissionOverwrite]]:
+        """computes a channel's permission overwrites after adding or removing helpers
+
+        Parameters
+        ----------
+        ticket_channel : `discord.TextChannel`
+            the channel\n
+        helpers : `List[discord.Member]`
+            helpers to add or remove\n
+        update : `bool`
+            True to add the helpers, False to remove them\n
+
+        Returns
+        -------
+        `Optional[Dict[Union[discord.Role, discord.Member], discord.PermissionOverwrite]]`:
+        all overwrites of the channel, None if nothing changes
+        """
+        overwrites = ticket_channel.overwrites
+        changed = False
+        for helper in helpers:
+            if ticket_channel.permissions_for(helper).read_messages == update:
+                continue
+            overwrite = overwrites.get(helper, discord.PermissionOverwrite())
+            overwrite.update(read_messages=update, send_messages=update)
+            overwrites[helper] = overwrite
+            changed = True
+        return overwrites if changed else None
 
     @classmethod
     async def modify_helpers_to_channel(cls, bot: commands.Bot, member_id: discord.Member.id = None, choice: types.HelperSync = 'ADD'):
+        """adds or removes the helpers who solved a ticket's challenge
+
+        Every channel gets a single edit with its new overwrites, channels where
+        nothing changes aren't edited.
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        member_id : `discord.Member.id`, optional
+            only sync this helper, by default every helper\n
+        choice : `types.HelperSync`, optional
+            True to add, False to remove\n
+        """
+        edits = 0
         for guild in bot.guilds:
             for channel_id in db.get_all_help_channels(guild.id):
                 if (channel_ := guild.get_channel(channel_id)):
@@ -245,9 +718,7 @@ class UpdateHelpers():
                     except AttributeError:
                         continue
 
-                    try:
-                        helpers = json.loads(helpers[0])
-                    except TypeError:
+                    if helpers is None:
                         continue
 
                     if not helpers:
@@ -257,48 +728,143 @@ class UpdateHelpers():
                         continue
 
                     if member_id:
-                        if member_id in helpers:
-                            await cls.modify_helper_to_channel(channel_, member_id, choice)
-                        continue
-                    for helper in helpers:
+                        helper_ids = [member_id] if member_id in helpers else []
+                    else:
                         try:
-                            if helper == db.get_user_id(channel_id):
-                                continue
+                            owner_id = db.get_ticket(channel_id).user_id
                         except ValueError:
-                            pass
-                        await cls.modify_helper_to_channel(channel_, helper, choice)
+                            owner_id = None
+                        helper_ids = [helper for helper in helpers if helper != owner_id]
+                    members = [member for helper in helper_ids
+                               if (member := guild.get_member(helper)) is not None]
+
+                    overwrites = cls.helper_overwrites(channel_, members, choice)
+                    if overwrites is not None:
+                        await channel_.edit(overwrites=overwrites)
+                        edits += 1
+        log.info(f"Synced helpers, edited {edits} channels")
 
 
 class UpdateOnlineHelpers():
-    @staticmethod
-    async def main(bot: commands.Bot):
-        messages = db.get_all_online_helper_messages()
-        for m in messages:
-            m = list(m)
-            channel = bot.get_channel(int(m[0]))
+    """Keeps the online helpers embeds up to date
+
+    The online helpers of every guild are tracked from presence and role updates.
+    A change schedules a single update of the guild's embeds after
+    `config.online_helpers['debounce']` seconds, embeds whose content didn't
+    change aren't edited.
+    """
+    _online: Dict[int, Set[int]] = {}
+    _hashes: Dict[int, str] = {}
+    _pending: Dict[int, asyncio.Task] = {}
+
+    @classmethod
+    async def main(cls, bot: commands.Bot):
+        """recounts the online helpers of every guild and updates all embeds
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        """
+        cls.load(bot)
+        for guild in bot.guilds:
+            await cls.update_guild(bot, guild.id)
+
+    @classmethod
+    def load(cls, bot: commands.Bot):
+        """counts the online helpers of every guild, scheduling an update where they changed
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        """
+        for guild in bot.guilds:
+            helper_role = GuildResolver.role(guild, 'helper')
+            online = {member.id for member in helper_role.members
+                      if member.status == discord.Status.online} if helper_role else set()
+            if cls._online.get(guild.id) != online:
+                cls._online[guild.id] = online
+                cls.schedule(bot, guild.id)
+
+    @classmethod
+    def member_changed(cls, bot: commands.Bot, member: discord.Member):
+        """updates a member's online state after a presence, role or membership change
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        member : `discord.Member`
+            the member after the change\n
+        """
+        if member.guild.id not in cls._online:
+            return
+        helper_role = GuildResolver.role(member.guild, 'helper')
+        is_online = (member.guild.get_member(member.id) is not None and helper_role in member.roles
+                     and member.status == discord.Status.online)
+        online = cls._online[member.guild.id]
+        if is_online == (member.id in online):
+            return
+        if is_online:
+            online.add(member.id)
+        else:
+            online.discard(member.id)
+        cls.schedule(bot, member.guild.id)
+
+    @classmethod
+    def schedule(cls, bot: commands.Bot, guild_id: int):
+        task = cls._pending.get(guild_id)
+        if task is None or task.done():
+            cls._pending[guild_id] = asyncio.create_task(cls._debounced(bot, guild_id))
+
+    @classmethod
+    async def _debounced(cls, bot: commands.Bot, guild_id: int):
+        await asyncio.sleep(config.online_helpers['debounce'])
+        cls._pending.pop(guild_id, None)
+        try:
+            await cls.update_guild(bot, guild_id)
+        except Exception as e:
+            log.exception(e)
+
+    @classmethod
+    async def update_guild(cls, bot: commands.Bot, guild_id: int):
+        """edits the online helpers embeds of a guild whose content changed
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        guild_id : `int`
+            the guild id\n
+        """
+        if (guild := bot.get_guild(guild_id)) is None:
+            return
+        embed = cls.create_online_helpers_embed(guild)
+        digest = hashlib.sha256(embed.description.encode()).hexdigest()
+        for channel_id, message_id in await adb.get_all_online_helper_messages():
+            channel = bot.get_channel(channel_id)
+            if channel is None:
+                await adb.delete_online_helper_message(message_id)
+                continue
+            if channel.guild.id != guild_id or cls._hashes.get(message_id) == digest:
+                continue
             try:
-                message = await channel.fetch_message(int(m[1]))
-            except (discord.errors.NotFound,AttributeError):
-                db.delete_online_helper_message(m[1])
+                await channel.get_partial_message(message_id).edit(embed=embed)
+            except discord.errors.NotFound:
+                await adb.delete_online_helper_message(message_id)
                 continue
+            cls._hashes[message_id] = digest
 
-            embed = UpdateOnlineHelpers.create_online_helpers_embed(
-                message.guild)
-            await message.edit(embed=embed)
-
-    @staticmethod
-    def create_online_helpers_embed(guild: discord.Guild):
+    @classmethod
+    def create_online_helpers_embed(cls, guild: discord.Guild):
         """creates a list of all online support helpers"""
-        helper_role = get(guild.roles, name=config.roles['helper'])
-        if helper_role.members:
-            helper_ids = [helper.id for helper in helper_role.members]
-            db_helpers = db.get_all_helpers()
-            helpers = set(helper_ids).intersection(db_helpers)
-
-            helpers = '\n'.join(
-                [member.mention for member in helper_role.members if (member.id in helpers and member.status == discord.Status.online)])
-        else:
-            helpers = 'No helpers online'
+        if guild.id not in cls._online:
+            helper_role = GuildResolver.role(guild, 'helper')
+            cls._online[guild.id] = {member.id for member in helper_role.members
+                                     if member.status == discord.Status.online} if helper_role else set()
+        helpers = cls._online[guild.id].intersection(db.get_all_helpers())
+        helpers = '\n'.join(f"<@{helper_id}>" for helper_id in sorted(helpers))
 
         if not helpers:  # if no helpers are online
             helpers = 'No helpers online'
@@ -0,0 +1,181 @@
+from collections import deque
+from typing import Deque, Dict, Optional
+import asyncio
+import time
+import logging
+
+import discord
+from discord.ext import commands
+
+import config
+from utils.api import TokenBucket
+from utils.resolver import GuildResolver, Overwrites
+
+log = logging.getLogger(__name__)
+
+class TicketChannelPool():
+    """Keeps hidden, pre-created channels around so a burst of new tickets doesn't
+    wait on channel creation
+
+    Parked channels live in the `config.channel_pool['category']` category, which
+    only the bot can see. A new ticket claims one and moves and re-permissions
+    it with a single edit. Claimed channels are replaced in the
+    background once no channel was claimed for `refill_delay` seconds, at most
+    `rate` per second, so refilling doesn't compete with a burst of tickets for
+    the guild's rate limits.
+
+    Discord allows two name or topic edits per channel every 10 minutes. Help
+    tickets aren't renamed by the claim, they get their name together with the
+    challenge topic (see `CreateTicketHelper`), so they make as many of those
+    edits as a created channel. Other tickets are renamed by the claim, so for
+    them reopening within 10 minutes of creation waits on the rate limit.
+    """
+    _parked: Dict[int, Deque[int]] = {}
+    _last_claim: Dict[int, float] = {}
+    _refills: Dict[int, asyncio.Task] = {}
+    _bot: Optional[commands.Bot] = None
+    _limiter = TokenBucket(config.channel_pool['rate'], config.channel_pool['burst'])
+
+    @staticmethod
+    def enabled() -> bool:
+        return config.channel_pool['enabled']
+
+    @classmethod
+    def start(cls, bot: commands.Bot) -> int:
+        """adopts the parked channels and starts filling every guild's pool
+
+        Runs again on every reconnect, replacing the pools and their refill tasks.
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+
+        Returns
+        -------
+        `int`: number of parked channels
+        """
+        if not cls.enabled():
+            return 0
+        cls._bot = bot
+        cls.stop()
+        for guild in bot.guilds:
+            category = GuildResolver.category(guild, config.channel_pool['category'])
+            cls._parked[guild.id] = deque(channel.id for channel in category.text_channels) if category else deque()
+            cls.schedule(guild)
+        return sum(len(parked) for parked in cls._parked.values())
+
+    @classmethod
+    def stop(cls):
+        for task in cls._refills.values():
+            task.cancel()
+        cls._refills = {}
+
+    @classmethod
+    def claim(cls, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """takes a parked channel out of the pool
+
+        Parameters
+        ----------
+        guild : `discord.Guild`
+            the guild\n
+
+        Returns
+        -------
+        `Optional[discord.TextChannel]`: the channel, None if the pool is disabled or empty
+        """
+        if not cls.enabled():
+            return None
+        parked = cls._parked.setdefault(guild.id, deque())
+        channel = None
+        while parked and channel is None:
+            channel = guild.get_channel(parked.popleft())
+        cls._last_claim[guild.id] = time.monotonic()
+        cls.schedule(guild)
+        return channel
+
+    @classmethod
+    async def assign(cls, channel: discord.TextChannel, category: discord.CategoryChannel,
+                     overwrites: Overwrites, name: Optional[str] = None) -> discord.TextChannel:
+        """turns a claimed channel into a ticket channel, putting it back into the pool if that fails
+
+        Parameters
+        ----------
+        channel : `discord.TextChannel`
+            the claimed channel\n
+        category : `discord.CategoryChannel`
+            the ticket's category\n
+        overwrites : `Overwrites`
+            the ticket's permission overwrites\n
+        name : `Optional[str]`, optional
+            the ticket's channel name, by default the channel keeps its parked name\n
+
+        Returns
+        -------
+        `discord.TextChannel`: the ticket channel
+
+        Raises
+        ------
+        `discord.HTTPException`: editing the channel failed
+        """
+        try:
+            fields = {"category": category, "overwrites": overwrites}
+            if name is not None:
+                fields["name"] = name
+            edited = await channel.edit(**fields)
+        except discord.HTTPException:
+            cls._parked.setdefault(channel.guild.id, deque()).appendleft(channel.id)
+            raise
+        return edited or channel
+
+    @classmethod
+    def schedule(cls, guild: discord.Guild):
+        task = cls._refills.get(guild.id)
+        if task is None or task.done():
+            cls._refills[guild.id] = asyncio.create_task(cls._refill(guild.id))
+
+    @classmethod
+    async def _refill(cls, guild_id: int):
+        backoff = config.channel_pool['refill_delay']
+        while True:
+            # looked up on every pass, a reconnect replaces both
+            if (guild := cls._bot.get_guild(guild_id)) is None:
+                return
+            parked = cls._parked.setdefault(guild_id, deque())
+            for channel_id in [channel_id for channel_id in parked if guild.get_channel(channel_id) is None]:
+                parked.remove(channel_id)
+            if len(parked) >= config.channel_pool['size']:
+                return
+            wait = cls._last_claim.get(guild_id, 0) + config.channel_pool['refill_delay'] - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            await cls._limiter.acquire()
+            try:
+                category = await cls._category(guild)
+                channel = await category.create_text_channel(
+                    config.channel_pool['name'], overwrites=cls._parked_overwrites(guild))
+            except Exception as e:
+                log.warning(f"Refilling the channel pool of {guild} failed, retrying in {backoff}s", exc_info=e)
+                await asyncio.sleep(backoff)
+                backoff = min(2 * backoff, config.channel_pool['max_backoff'])
+                continue
+            backoff = config.channel_pool['refill_delay']
+            parked.append(channel.id)
+            log.debug(f"Parked {channel} in {guild} ({len(parked)}/{config.channel_pool['size']})")
+
+    @staticmethod
+    def _parked_overwrites(guild: discord.Guild) -> Overwrites:
+        return {
+            guild.default_role: discord.PermissionOverwrite(read_messages=False),
+            guild.me: discord.PermissionOverwrite(read_messages=True, manage_channels=True)
+        }
+
+    @classmethod
+    async def _category(cls, guild: discord.Guild) -> discord.CategoryChannel:
+        category = GuildResolver.category(guild, config.channel_pool['category'])
+        if category is None:
+            new_category = await guild.create_category(
+                name=config.channel_pool['category'], overwrites=cls._parked_overwrites(guild))
+            category = guild.get_channel(new_category.id)
+        return category
@@ -0,0 +1,60 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Union
+import logging
+
+import config
+from utils.database.db import DatabaseManager
+
+log = logging.getLogger(__name__)
+
+class _AsyncDatabaseMeta(type):
+    def __getattr__(cls, name: str) -> Callable:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        method = getattr(DatabaseManager, name)
+        if not callable(method):
+            raise AttributeError(name)
+
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(cls._executor(name), functools.partial(method, *args, **kwargs))
+
+        setattr(cls, name, wrapper)
+        return wrapper
+
+class AsyncDatabaseManager(metaclass=_AsyncDatabaseMeta):
+    """Awaitable versions of every `DatabaseManager` method
+
+    Reads (methods starting with `get_`) run concurrently on a small pool of
+    reader threads, everything else is serialized on a single writer thread
+    so sqlite work never blocks the event loop.
+
+    Usage: `await AsyncDatabaseManager.get_status(channel_id)`
+    """
+    read_prefixes = ("get_",)
+    _reader: Union[ThreadPoolExecutor, None] = None
+    _writer: Union[ThreadPoolExecutor, None] = None
+
+    @classmethod
+    def _executor(cls, name: str) -> ThreadPoolExecutor:
+        if name.startswith(cls.read_prefixes):
+            if cls._reader is None:
+                cls._reader = ThreadPoolExecutor(
+                    max_workers=config.database['read_workers'], thread_name_prefix="db-read")
+            return cls._reader
+        if cls._writer is None:
+            cls._writer = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="db-write")
+        return cls._writer
+
+    @classmethod
+    def shutdown(cls):
+        """waits for queued database work and stops the worker threads"""
+        for executor in (cls._writer, cls._reader):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        cls._reader = cls._writer = None
+        log.info("Stopped database worker threads")
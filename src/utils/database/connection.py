@@ -0,0 +1,60 @@
+import sqlite3
+import threading
+from typing import List
+import logging
+
+import config
+
+log = logging.getLogger(__name__)
+
+class ConnectionManager():
+    """Long-lived sqlite connections shared by all database actions
+
+    Every thread gets a single connection which is opened on first use,
+    tuned with the pragmas in `config.database` and kept open until `close`
+    """
+    _local = threading.local()
+    _connections: List[sqlite3.Connection] = []
+    _lock = threading.Lock()
+
+    @classmethod
+    def _open(cls) -> sqlite3.Connection:
+        conn = sqlite3.connect(config.database['path'],
+                               timeout=config.database['timeout'],
+                               cached_statements=config.database['cached_statements'],
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma, value in config.database['pragmas'].items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        log.debug(f"Opened database connection for {threading.current_thread().name}")
+        return conn
+
+    @classmethod
+    def get(cls) -> sqlite3.Connection:
+        """gets the connection of the current thread, opening it if needed
+
+        Returns
+        -------
+        `sqlite3.Connection`: the connection
+        """
+        conn = getattr(cls._local, 'conn', None)
+        if conn is None:
+            conn = cls._open()
+            cls._local.conn = conn
+            with cls._lock:
+                cls._connections.append(conn)
+        return conn
+
+    @classmethod
+    def close(cls):
+        """optimizes and closes every open connection"""
+        with cls._lock:
+            for conn in cls._connections:
+                try:
+                    conn.execute("PRAGMA optimize")
+                    conn.close()
+                except sqlite3.Error as e:
+                    log.exception(e)
+            log.info(f"Closed {len(cls._connections)} database connection(s)")
+            cls._connections.clear()
+            cls._local = threading.local()
@@ -1,12 +1,14 @@
 import sqlite3
-import json
+import time
+from contextlib import contextmanager
 from itertools import chain
-from typing import Union, List
+from typing import Iterable, Iterator, Optional, Tuple, Union, List
 import logging
 
 from utils import types
-from utils.utility import Challenge
-from utils import exceptions
+from utils.utility import Challenge, ChallengeRefresh, Ticket
+from utils.database.connection import ConnectionManager
+from utils.database.store import TicketStore
 
 log = logging.getLogger(__name__)
 
@@ -16,24 +18,36 @@ class DatabaseManager():
     @classmethod
     def _db_connect(cls) -> Union[sqlite3.Connection, None]:
         try:
-            conn = sqlite3.connect('utils/database/bot.db')
-            conn.row_factory = sqlite3.Row
+            conn = ConnectionManager.get()
         except Exception as e:
             log.exception(e)
             return None
         return conn
 
     @classmethod
-    def _raw_insert(cls, query: str, *values):
+    def close(cls):
+        """closes all database connections"""
+        ConnectionManager.close()
+
+    @classmethod
+    @contextmanager
+    def _transaction(cls) -> Iterator[sqlite3.Connection]:
+        """runs everything inside the block in a single write transaction"""
+        conn = cls._db_connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    @classmethod
+    def _raw_insert(cls, query: str, *values) -> bool:
         conn = cls._db_connect()
-        cur = conn.cursor()
         try:
             with conn:
-                cur.execute(query, *values)
+                conn.execute(query, *values)
         except Exception as e:
             log.exception(str(e))
-        finally:
-            conn.close()
+            return False
+        return True
 
     @classmethod
     def _raw_update(cls, query: str, *values):
@@ -46,25 +60,59 @@ class DatabaseManager():
     @classmethod
     def _raw_select(cls, query: str, *values, fetch_one: bool = False, fetch_all: bool = True) -> Union[sqlite3.Row, list]:
         conn = cls._db_connect()
-        cur = conn.cursor()
         ret = []
         try:
-            with conn:
-                cur.execute(query, *values)
-                if fetch_one:
-                    ret = cur.fetchone()
-                elif fetch_all:
-                    ret = cur.fetchall()
-                else:
-                    ret = cur.fetchall()
+            cur = conn.execute(query, *values)
+            if fetch_one:
+                ret = cur.fetchone()
+            elif fetch_all:
+                ret = cur.fetchall()
+            else:
+                ret = cur.fetchall()
         except Exception as e:
             log.exception(str(e))
-        finally:
-            conn.close()
         return ret
 
     @classmethod
-    def create_ticket(cls, channel_id: int, channel_name: str, guild_id: int, user_id: int, t_type: types.TicketType, status: types.TicketStatus, bg_check: types.TicketCheck):
+    def get_ticket(cls, channel_id: int) -> Ticket:
+        """gets a ticket from the ticket store, or the database if the store isn't loaded
+
+        Parameters
+        ----------
+        channel_id : `int`
+            the channel id\n
+
+        Returns
+        -------
+        `Ticket`: the ticket
+        """
+        if (ticket := TicketStore.get(channel_id)) is None and not TicketStore.loaded:
+            query = """
+            SELECT * FROM requests
+            WHERE channel_id = $1"""
+            values = (channel_id,)
+            if (row := cls._raw_select(query, values, fetch_one=True)):
+                ticket = Ticket.from_row(row)
+                TicketStore.put(ticket)
+        if ticket is None:
+            raise ValueError(
+                f"No channel exists with id {channel_id}")
+        return ticket
+
+    @classmethod
+    def load_ticket_store(cls) -> int:
+        """loads every ticket into the ticket store
+
+        Returns
+        -------
+        `int`: number of tickets loaded
+        """
+        query = "SELECT * FROM requests"
+        rows = cls._raw_select(query)
+        return TicketStore.load(Ticket.from_row(row) for row in rows)
+
+    @classmethod
+    def create_ticket(cls, channel_id: int, channel_name: str, guild_id: int, user_id: int, t_type: types.TicketType, status: types.TicketStatus, bg_check: types.TicketCheck, number: int = None):
         """create a ticket
 
         Parameters
@@ -83,13 +131,18 @@ class DatabaseManager():
             status of ticket\n
         bg_check : `types.TicketCheck`
             whether the ticket is checked or not\n
+        number : `int`, `optional`
+            the ticket's number, by default None\n
         """
+        now = time.time()
         query = """
-        INSERT INTO requests(channel_id, channel_name, guild_id, user_id, t_type, status, bg_check) 
-        VALUES ($1,$2,$3,$4,$5,$6,$8 )"""
+        INSERT INTO requests(channel_id, channel_name, guild_id, user_id, t_type, status, bg_check, number, created_at, last_message_at) 
+        VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$9)"""
         values = (channel_id, channel_name, guild_id,
-                  user_id, t_type, status, bg_check,)
-        cls._raw_insert(query, values)
+                  user_id, t_type, status, bg_check, number, now,)
+        if cls._raw_insert(query, values):
+            TicketStore.put(Ticket(channel_id, channel_name, guild_id,
+                                   user_id, t_type, status, int(bg_check), number, created_at=now, last_message_at=now))
 
     @classmethod
     def update_ticket_name(cls, channel_name: str, channel_id: int):
@@ -106,7 +159,8 @@ class DatabaseManager():
         UPDATE requests 
         SET channel_name = $1 WHERE channel_id = $2"""
         values = (channel_name, channel_id,)
-        cls._raw_update(query, values)
+        if cls._raw_update(query, values):
+            TicketStore.update(channel_id, channel_name=channel_name)
 
     @classmethod
     def delete_ticket(cls, channel_id: int):
@@ -122,7 +176,8 @@ class DatabaseManager():
         WHERE channel_id = $1
         """
         values = (channel_id,)
-        cls._raw_delete(query, values)
+        if cls._raw_delete(query, values):
+            TicketStore.remove(channel_id)
 
     @classmethod
     def move_ticket_to_archive(cls, channel_id: int):
@@ -134,8 +189,10 @@ class DatabaseManager():
             the channel's id_\n
         """
         query = """
-        INSERT INTO archive
-        SELECT * FROM requests
+        INSERT OR REPLACE INTO archive(channel_id, channel_name, guild_id, user_id, t_type, status, bg_check, number,
+        created_at, closed_at, last_message_at, last_message_author_is_staff)
+        SELECT channel_id, channel_name, guild_id, user_id, t_type, status, bg_check, number,
+        created_at, closed_at, last_message_at, last_message_author_is_staff FROM requests
         WHERE channel_id = $1
         """
         values = (channel_id,)
@@ -154,17 +211,8 @@ class DatabaseManager():
         -------
         `int`: the user's id
         """
-
-        query = """
-        SELECT user_id FROM requests
-        WHERE channel_id = $1"""
-        values = (channel_id,)
-        user_id = cls._raw_select(query, values, fetch_one=True)
-        try:
-            return int(user_id[0])
-        except TypeError as e:
-            raise ValueError(
-                f"No channel exists with id {channel_id}") from e
+        ticket = cls.get_ticket(channel_id)
+        return int(ticket.user_id)
 
     @classmethod
     def get_all_help_channels(cls, guild_id: int) -> List[int]:
@@ -199,16 +247,8 @@ class DatabaseManager():
         -------
         `str`: the channel's status
         """
-        query = """
-        SELECT status FROM requests
-        WHERE channel_id = $1"""
-        values = (channel_id,)
-        status = cls._raw_select(query, values, fetch_one=True)
-        try:
-            return status[0]
-        except TypeError as e:
-            raise ValueError(
-                f"No channel exists with id {channel_id}") from e
+        ticket = cls.get_ticket(channel_id)
+        return ticket.status
 
     @classmethod
     def get_user_open_tickets(cls, t_type: types.TicketType, user_id: int):
@@ -234,51 +274,29 @@ class DatabaseManager():
         return n_tickets[0]
 
     @classmethod
-    def get_number_new(cls, t_type: types.TicketType, guild_id: int) -> int:
-        """gets the number of tickets of that ticket type
+    def next_ticket_number(cls, t_type: types.TicketType, guild_id: int) -> int:
+        """atomically claims the next number for a ticket type in a guild
 
         Parameters
         ----------
         t_type : `types.TicketType`
             type of ticket\n
+        guild_id : `int`
+            the guild id\n
 
         Returns
         -------
         `int`: new number
         """
         query = """
-        SELECT count(1) FROM
-        (SELECT * FROM requests WHERE t_type=$1 AND guild_id = $2
-        union SELECT * FROM archive WHERE t_type=$1 AND guild_id = $2)"""
-        values = (t_type, guild_id,)
-        ret = cls._raw_select(query, values, fetch_one=True)
-        return int(ret[0])
-
-    @classmethod
-    def get_number_previous(cls, channel_id: int) -> str:
-        """gets the number of tickets of that ticket type
-
-        Parameters
-        ----------
-        channel_id : `int`
-            the channel id\n
-
-        Returns
-        -------
-        `str`: previous number
-        """
-        query = """
-        SELECT channel_name FROM requests 
-        WHERE channel_id = $1"""
-        values = (channel_id,)
-        db_channel_name_str = cls._raw_select(query, values, fetch_one=True)
-        try:
-            db_channel_name = db_channel_name_str[0].lower()
-        except TypeError as e:
-            raise ValueError(
-                f"No channel exists with id {channel_id}") from e
-        number = db_channel_name.split("-")[-1]
-        return number
+        INSERT INTO ticket_counters(guild_id, t_type, value)
+        VALUES($1,$2,1)
+        ON CONFLICT(guild_id, t_type) DO UPDATE SET value = value + 1
+        RETURNING value - 1"""
+        values = (guild_id, t_type,)
+        with cls._transaction() as conn:
+            ret = conn.execute(query, values).fetchall()
+        return int(ret[0][0])
 
     @classmethod
     def get_ticket_type(cls, channel_id: int) -> types.TicketType:
@@ -292,16 +310,8 @@ class DatabaseManager():
         -------
         `types.TicketType`: ticket type
         """
-        query = """
-        SELECT t_type FROM requests 
-        WHERE channel_id = $1"""
-        values = (channel_id,)
-        t_type = cls._raw_select(query, values, fetch_one=True)
-        try:
-            return t_type[0]
-        except TypeError as e:
-            raise ValueError(
-                f"No channel exists with id {channel_id}") from e
+        ticket = cls.get_ticket(channel_id)
+        return ticket.t_type
 
     @classmethod
     def get_channel_name(cls, channel_id: int) -> str:
@@ -315,16 +325,8 @@ class DatabaseManager():
         -------
         `str`: the channel name
         """
-        query = """
-        SELECT channel_name FROM requests 
-        WHERE channel_id = $1"""
-        values = (channel_id,)
-        db_channel_name_str = cls._raw_select(query, values, fetch_one=True)
-        try:
-            return db_channel_name_str[0].lower()
-        except TypeError as e:
-            raise ValueError(
-                f"No channel exists with id {channel_id}") from e
+        ticket = cls.get_ticket(channel_id)
+        return ticket.channel_name.lower()
 
     @classmethod
     def update_status(cls, status: types.TicketStatus, channel_id: int):
@@ -337,11 +339,37 @@ class DatabaseManager():
         channel_id : `int`
             the channel id\n
         """
+        closed_at = time.time() if status == "closed" else None
         query = """
         UPDATE requests
-        SET status = $1 WHERE channel_id = $2"""
-        values = (status, channel_id,)
-        cls._raw_update(query, values)
+        SET status = $1, closed_at = $2 WHERE channel_id = $3"""
+        values = (status, closed_at, channel_id,)
+        if cls._raw_update(query, values):
+            TicketStore.update(channel_id, status=status, closed_at=closed_at)
+
+    @classmethod
+    def update_ticket_activity(cls, activity: List[Tuple[int, float, bool]]):
+        """stores the latest message of many tickets in one transaction
+
+        Older timestamps than the stored ones are ignored.
+
+        Parameters
+        ----------
+        activity : `List[Tuple[int, float, bool]]`
+            (channel id, unix timestamp of the message, whether the author is staff) for every ticket\n
+        """
+        query = """
+        UPDATE requests
+        SET last_message_at = $1, last_message_author_is_staff = $2
+        WHERE channel_id = $3 AND (last_message_at IS NULL OR last_message_at <= $1)"""
+        with cls._transaction() as conn:
+            conn.executemany(query, [(timestamp, int(is_staff), channel_id)
+                                     for channel_id, timestamp, is_staff in activity])
+        for channel_id, timestamp, is_staff in activity:
+            ticket = TicketStore.get(channel_id)
+            if ticket is not None and (ticket.last_message_at or 0) <= timestamp:
+                TicketStore.update(channel_id, last_message_at=timestamp,
+                                   last_message_author_is_staff=int(is_staff))
 
     @classmethod
     def get_check(cls, channel_id: int) -> types.TicketCheck:
@@ -356,16 +384,8 @@ class DatabaseManager():
         -------
         `int(types.TicketCheck)`: the bg_check
         """
-        query = """
-        SELECT bg_check FROM requests 
-        WHERE channel_id = $1"""
-        values = (channel_id,)
-        bg_check = cls._raw_select(query, values, fetch_one=True)
-        try:
-            return bg_check[0]
-        except TypeError as e:
-            raise ValueError(
-                f"No channel exists with id {channel_id}") from e
+        ticket = cls.get_ticket(channel_id)
+        return ticket.bg_check
 
     @classmethod
     def update_check(cls, bg_check: types.TicketCheck, channel_id: int):
@@ -381,7 +401,8 @@ class DatabaseManager():
         query = """
         UPDATE requests
         SET bg_check = $1 WHERE channel_id = $2"""
-        cls._raw_update(query, (bg_check, channel_id))
+        if cls._raw_update(query, (bg_check, channel_id)):
+            TicketStore.update(channel_id, bg_check=int(bg_check))
 
     @classmethod
     def get_guild_safe_tickets(cls, guild_id: int) -> List[str]:
@@ -404,6 +425,26 @@ class DatabaseManager():
         safe_tickets = cls._raw_select(query, values, fetch_all=True)
         return list(chain(*safe_tickets))
 
+    @classmethod
+    def get_autoclose_candidates(cls, guild_id: int) -> List[Ticket]:
+        """gets every open ticket in a guild that autoclose isn't ignoring
+
+        Parameters
+        ----------
+        guild_id : `int`
+            the guild id\n
+
+        Returns
+        -------
+        `List[Ticket]`: the tickets
+        """
+        query = """
+        SELECT * FROM requests
+        WHERE guild_id = $1 AND status = 'open' AND bg_check != 2"""
+        values = (guild_id,)
+        tickets = cls._raw_select(query, values)
+        return [Ticket.from_row(row) for row in tickets]
+
     @classmethod
     def get_all_challenges(cls) -> List[sqlite3.Row]:
         query = "SELECT * FROM challenges"
@@ -420,25 +461,101 @@ class DatabaseManager():
         return challenge
 
     @classmethod
-    def get_helpers_from_title(cls, title: str):
+    def get_helpers_from_title(cls, title: str) -> Union[List[int], None]:
+        """gets every helper who solved a challenge
+
+        Parameters
+        ----------
+        title : `str`
+            the challenge's title\n
+
+        Returns
+        -------
+        `Union[List[int], None]`: the helpers' ids, None if the challenge does not exist
+        """
         query = """
-        SELECT helper_id_list FROM challenges 
-        WHERE title = $1"""
+        SELECT solvers.discord_id FROM challenges
+        LEFT JOIN solves ON solves.challenge_id = challenges.id
+        LEFT JOIN solvers ON solvers.is_helper = 1 AND solves.is_team = (solvers.team_id IS NOT NULL)
+          AND solves.owner_id = coalesce(solvers.team_id, solvers.discord_id)
+        WHERE challenges.title = $1"""
         values = (title, )
-        return cls._raw_select(query, values, fetch_one=True)
+        rows = cls._raw_select(query, values)
+        if not rows:
+            return None
+        return [row[0] for row in rows if row[0] is not None]
 
     @classmethod
-    def refresh_database_ch(cls, challenges: List[Challenge]):
-        delete_query = "DELETE FROM challenges"
-        cls._raw_delete(delete_query)
-        insert_query = """
-        INSERT INTO challenges(id, title, author, category, ignore, helper_id_list)
-        VALUES($1,$2,$3,$4,$5,$6)"""
-        for id_, title, author, category, ignore, _ in challenges:
-            values = (id_, title, author, category, ignore, str([]))
-            cls._raw_insert(insert_query, values)
+    def get_helpers_for_challenge(cls, challenge_id: int, available_only: bool = False) -> List[int]:
+        """gets every helper who solved a challenge
 
-        # all_helpers = {guild.get_member_named(ch.author) for ch in challenges}
+        Parameters
+        ----------
+        challenge_id : `int`
+            the challenge's id\n
+        available_only : `bool`, `optional`
+            only return helpers whose status is available, by default False\n
+
+        Returns
+        -------
+        `List[int]`: the helpers' ids
+        """
+        query = """
+        SELECT solvers.discord_id FROM solves
+        JOIN solvers ON solvers.is_helper = 1 AND solves.is_team = (solvers.team_id IS NOT NULL)
+          AND solves.owner_id = coalesce(solvers.team_id, solvers.discord_id)"""
+        if available_only:
+            query += """
+        JOIN helpers ON helpers.discord_id = solvers.discord_id AND helpers.is_available = 1"""
+        query += """
+        WHERE solves.challenge_id = $1"""
+        values = (challenge_id,)
+        helpers = cls._raw_select(query, values)
+        return list(chain(*helpers))
+
+    @classmethod
+    def refresh_database_ch(cls, challenges: List[Challenge]) -> Optional[ChallengeRefresh]:
+        """syncs the challenges table with the released challenges in one transaction
+
+        New challenges are inserted, changed ones are updated in place and
+        challenges that are no longer released are deleted.
+
+        Parameters
+        ----------
+        challenges : `List[Challenge]`
+            all released challenges\n
+
+        Returns
+        -------
+        `Optional[ChallengeRefresh]`: ids of the added, updated and removed challenges, None if the refresh failed
+        """
+        upsert_query = """
+        INSERT INTO challenges(id, title, author, category, ignore)
+        VALUES($1,$2,$3,$4,$5)
+        ON CONFLICT(id) DO UPDATE SET
+        title = excluded.title, author = excluded.author,
+        category = excluded.category, ignore = excluded.ignore"""
+        delete_query = """
+        DELETE FROM challenges
+        WHERE id = $1"""
+        incoming = {ch.id: (ch.id, ch.title, ch.author, ch.category, int(ch.ignore))
+                    for ch in challenges}
+        try:
+            with cls._transaction() as conn:
+                existing = {row[0]: tuple(row) for row in conn.execute(
+                    "SELECT id, title, author, category, ignore FROM challenges")}
+                added = [id_ for id_ in incoming if id_ not in existing]
+                updated = [id_ for id_, values in incoming.items()
+                           if id_ in existing and existing[id_] != values]
+                removed = [id_ for id_ in existing if id_ not in incoming]
+
+                conn.executemany(upsert_query, [incoming[id_]
+                                 for id_ in added + updated])
+                conn.executemany(delete_query, [(id_,) for id_ in removed])
+        except Exception as e:
+            log.exception(str(e))
+            return None
+        return ChallengeRefresh(added, updated, removed)
 
     @classmethod
     def create_helper(cls, discord_id: int):
@@ -476,7 +593,7 @@ class DatabaseManager():
         query = """
         DELETE FROM helpers
         WHERE discord_id = $1"""
-        values = (str(discord_id),)
+        values = (discord_id,)
         cls._raw_delete(query, values)
 
     @classmethod
@@ -488,30 +605,199 @@ class DatabaseManager():
         cls._raw_update(query, values)
 
     @classmethod
-    def update_helpers_ch(cls, helper_id_list: List[int], challenge_id: int):
-        helpers = json.dumps(helper_id_list)
+    def set_helpers(cls, helper_ids: Iterable[int]) -> List[int]:
+        """marks exactly the given users as helpers in the solves mirror, in one transaction
+
+        Parameters
+        ----------
+        helper_ids : `Iterable[int]`
+            discord ids of the helpers\n
+
+        Returns
+        -------
+        `List[int]`: ids of challenges the helpers solved that do not exist
+        """
         query = """
-        UPDATE challenges
-        SET helper_id_list = $1 WHERE id = $2"""
-        values = (helpers, challenge_id,)
-        cls._raw_update(query, values)
+        INSERT INTO solvers(discord_id, team_id, resolved_at, is_helper)
+        VALUES($1,NULL,0,1)
+        ON CONFLICT(discord_id) DO UPDATE SET is_helper = 1"""
+        with cls._transaction() as conn:
+            conn.execute("UPDATE solvers SET is_helper = 0 WHERE is_helper = 1")
+            conn.executemany(query, [(helper_id,) for helper_id in helper_ids])
+            missing = conn.execute("""
+            SELECT DISTINCT solves.challenge_id FROM solvers
+            JOIN solves ON solves.is_team = (solvers.team_id IS NOT NULL)
+              AND solves.owner_id = coalesce(solvers.team_id, solvers.discord_id)
+            WHERE solvers.is_helper = 1
+              AND solves.challenge_id NOT IN (SELECT id FROM challenges)""").fetchall()
+        return sorted(row[0] for row in missing)
+
+    @classmethod
+    def get_solver(cls, discord_id: int) -> Optional[sqlite3.Row]:
+        query = """
+        SELECT discord_id, team_id, resolved_at FROM solvers
+        WHERE discord_id = $1"""
+        values = (discord_id,)
+        return cls._raw_select(query, values, fetch_one=True) or None
 
     @classmethod
-    def update_helper_ch(cls, helper_id: int, challenge_id: int):
-        challenge = cls.get_challenge_from_id(challenge_id)
-        if challenge is None:
-            raise exceptions.ChallengeDoesNotExist(challenge_id)
-        challenge = Challenge(*challenge)
+    def update_solver(cls, discord_id: int, team_id: Optional[int]):
+        query = """
+        INSERT INTO solvers(discord_id, team_id, resolved_at)
+        VALUES($1,$2,$3)
+        ON CONFLICT(discord_id) DO UPDATE SET team_id = excluded.team_id, resolved_at = excluded.resolved_at"""
+        values = (discord_id, team_id, time.time(),)
+        cls._raw_insert(query, values)
 
-        helpers = json.loads(challenge.helper_id_list)
-        helpers.append(helper_id)
-        helpers = json.dumps(list(set(helpers)))
+    @classmethod
+    def get_solve_cursor(cls, is_team: bool, owner_id: int) -> Optional[sqlite3.Row]:
         query = """
-        UPDATE challenges
-        SET helper_id_list = $1 WHERE id = $2"""
-        values = (helpers, challenge_id,)
+        SELECT last_solve_id, synced_at, full_synced_at FROM solve_cursors
+        WHERE is_team = $1 AND owner_id = $2"""
+        values = (int(is_team), owner_id,)
+        return cls._raw_select(query, values, fetch_one=True) or None
+
+    @classmethod
+    def get_solved_challenges(cls, discord_id: int) -> List[int]:
+        """gets the challenges a user solved from the local solves mirror,
+        the team's solves if they are in one
+
+        Parameters
+        ----------
+        discord_id : `int`
+            the user's discord id\n
+
+        Returns
+        -------
+        `List[int]`: ids of the solved challenges
+        """
+        query = """
+        SELECT solves.challenge_id FROM solvers
+        JOIN solves ON solves.is_team = (solvers.team_id IS NOT NULL)
+          AND solves.owner_id = coalesce(solvers.team_id, solvers.discord_id)
+        WHERE solvers.discord_id = $1"""
+        values = (discord_id,)
+        return [row[0] for row in cls._raw_select(query, values)]
+
+    @classmethod
+    def store_solves(cls, is_team: bool, owner_id: int, solves: List[Tuple[int, Optional[int]]], full: bool):
+        """stores the solves of a solo player or team and moves their sync cursor in one transaction
+
+        Parameters
+        ----------
+        is_team : `bool`
+            whether `owner_id` is a team id or the discord id of a solo player\n
+        owner_id : `int`
+            the team or player\n
+        solves : `List[Tuple[int, Optional[int]]]`
+            (challenge id, solve id) of every new solve\n
+        full : `bool`
+            whether `solves` is the complete list, replacing everything stored before\n
+        """
+        now = time.time()
+        solve_ids = [solve_id for _, solve_id in solves]
+        with cls._transaction() as conn:
+            cursor = conn.execute("""
+            SELECT last_solve_id, full_synced_at FROM solve_cursors
+            WHERE is_team = $1 AND owner_id = $2""", (int(is_team), owner_id)).fetchone()
+            if full:
+                conn.execute("""
+                DELETE FROM solves
+                WHERE is_team = $1 AND owner_id = $2""", (int(is_team), owner_id))
+                last_solve_id = None if None in solve_ids else max(solve_ids, default=None)
+                full_synced_at = now
+            else:
+                last_solve_id = max([cursor['last_solve_id'], *solve_ids]) if cursor else max(solve_ids, default=None)
+                full_synced_at = cursor['full_synced_at'] if cursor else None
+            conn.executemany("""
+            INSERT OR REPLACE INTO solves(is_team, owner_id, challenge_id, solve_id)
+            VALUES($1,$2,$3,$4)""", [(int(is_team), owner_id, challenge_id, solve_id) for challenge_id, solve_id in solves])
+            conn.execute("""
+            INSERT OR REPLACE INTO solve_cursors(is_team, owner_id, last_solve_id, synced_at, full_synced_at)
+            VALUES($1,$2,$3,$4,$5)""", (int(is_team), owner_id, last_solve_id, now, full_synced_at))
+
+    @classmethod
+    def create_job(cls, name: str, payload: str) -> int:
+        """queues a job for the worker process
+
+        Parameters
+        ----------
+        name : `str`
+            the job\n
+        payload : `str`
+            json arguments of the job\n
+
+        Returns
+        -------
+        `int`: the job id
+        """
+        query = """
+        INSERT INTO jobs(name, payload, created_at)
+        VALUES($1,$2,$3)"""
+        with cls._transaction() as conn:
+            return conn.execute(query, (name, payload, time.time())).lastrowid
+
+    @classmethod
+    def claim_job(cls) -> Optional[sqlite3.Row]:
+        """marks the oldest queued job as running
+
+        Returns
+        -------
+        `Optional[sqlite3.Row]`: id, name and payload of the job, None if no job is queued
+        """
+        query = """
+        UPDATE jobs SET status = 'running', started_at = $1
+        WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1)
+        RETURNING id, name, payload"""
+        with cls._transaction() as conn:
+            return conn.execute(query, (time.time(),)).fetchone()
+
+    @classmethod
+    def finish_job(cls, job_id: int, status: str, result: str):
+        query = """
+        UPDATE jobs SET status = $1, result = $2, finished_at = $3
+        WHERE id = $4"""
+        values = (status, result, time.time(), job_id,)
+        cls._raw_update(query, values)
+
+    @classmethod
+    def cancel_job(cls, job_id: int):
+        query = """
+        UPDATE jobs SET status = 'cancelled', finished_at = $1
+        WHERE id = $2 AND status = 'queued'"""
+        values = (time.time(), job_id,)
         cls._raw_update(query, values)
 
+    @classmethod
+    def fail_running_jobs(cls) -> int:
+        """fails the jobs a previous worker left running
+
+        Returns
+        -------
+        `int`: number of failed jobs
+        """
+        query = """
+        UPDATE jobs SET status = 'failed', result = '{"error": "worker restarted"}', finished_at = $1
+        WHERE status = 'running'"""
+        with cls._transaction() as conn:
+            return conn.execute(query, (time.time(),)).rowcount
+
+    @classmethod
+    def delete_finished_jobs(cls, before: float):
+        query = """
+        DELETE FROM jobs
+        WHERE status NOT IN ('queued', 'running') AND finished_at < $1"""
+        values = (before,)
+        cls._raw_delete(query, values)
+
+    @classmethod
+    def get_job(cls, job_id: int) -> Optional[sqlite3.Row]:
+        query = """
+        SELECT id, name, status, result FROM jobs
+        WHERE id = $1"""
+        values = (job_id,)
+        return cls._raw_select(query, values, fetch_one=True) or None
+
     @classmethod
     def create_online_helper_message(cls, channel_id: int, message_id: int):
         query = """
@@ -523,7 +809,7 @@ class DatabaseManager():
     @classmethod
     def get_all_online_helper_messages(cls) -> List[sqlite3.Row]:
         query = """
-        SELECT * FROM online_helpers
+        SELECT channel_id, message_id FROM online_helpers
         """
         all_online_members = cls._raw_select(query)
         return all_online_members
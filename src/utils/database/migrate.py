@@ -0,0 +1,92 @@
+import os
+import re
+import sqlite3
+from typing import List, NamedTuple
+import logging
+
+from utils.database.connection import ConnectionManager
+
+log = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: str
+
+class MigrationManager():
+    """Applies the numbered sql scripts in `migrations/` that the database hasn't seen yet
+
+    Scripts are named `<version>_<name>.sql` and are applied in order, each one in
+    its own transaction. Applied versions are recorded in the `schema_version` table.
+    """
+
+    @classmethod
+    def migrations(cls) -> List[Migration]:
+        """gets every migration script, ordered by version
+
+        Returns
+        -------
+        `List[Migration]`: all migrations
+        """
+        migrations = []
+        for filename in os.listdir(MIGRATIONS_DIR):
+            if (match := re.fullmatch(r"(\d+)_(\w+)\.sql", filename)):
+                migrations.append(Migration(int(match.group(1)), match.group(2),
+                                            os.path.join(MIGRATIONS_DIR, filename)))
+        return sorted(migrations)
+
+    @classmethod
+    def current_version(cls, conn: sqlite3.Connection) -> int:
+        """gets the latest applied schema version
+
+        Parameters
+        ----------
+        conn : `sqlite3.Connection`
+            the connection\n
+
+        Returns
+        -------
+        `int`: the schema version, 0 if nothing was applied
+        """
+        with conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+              version INTEGER PRIMARY KEY,
+              name TEXT,
+              applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )""")
+        version = conn.execute("SELECT max(version) FROM schema_version").fetchone()[0]
+        return version or 0
+
+    @classmethod
+    def run(cls) -> int:
+        """applies all pending migrations
+
+        Returns
+        -------
+        `int`: the schema version after migrating
+        """
+        conn = ConnectionManager.get()
+        version = cls.current_version(conn)
+        for migration in cls.migrations():
+            if migration.version <= version:
+                continue
+            with open(migration.path, encoding="utf-8") as file:
+                script = file.read()
+            try:
+                conn.executescript(f"""
+                BEGIN;
+                {script}
+                INSERT INTO schema_version(version, name) VALUES ({migration.version}, '{migration.name}');
+                COMMIT;""")
+            except sqlite3.Error:
+                if conn.in_transaction:
+                    conn.rollback()
+                log.critical(f"Migration {migration.version} ({migration.name}) failed")
+                raise
+            version = migration.version
+            log.info(f"Applied migration {migration.version} ({migration.name})")
+        log.info(f"Database schema is at version {version}")
+        return version
@@ -1,4 +1,4 @@
-CREATE TABLE requests (
+CREATE TABLE IF NOT EXISTS requests (
   channel_id bigint,
   channel_name VARCHAR(255),
   guild_id bigint,
@@ -8,7 +8,7 @@ CREATE TABLE requests (
   bg_check BOOLEAN
 );
 
-CREATE TABLE archive (
+CREATE TABLE IF NOT EXISTS archive (
   channel_id bigint,
   channel_name VARCHAR(255),
   guild_id bigint,
@@ -18,7 +18,7 @@ CREATE TABLE archive (
   bg_check BOOLEAN
 );
 
-CREATE TABLE challenges (
+CREATE TABLE IF NOT EXISTS challenges (
     id INTEGER UNIQUE,
     title VARCHAR(255),
     author VARCHAR(255),
@@ -27,13 +27,13 @@ CREATE TABLE challenges (
     helper_id_list VARCHAR(255)
 );
 
-CREATE TABLE helpers (
+CREATE TABLE IF NOT EXISTS helpers (
   discord_id INTEGER UNIQUE,
   is_available BOOLEAN
 );
 
 
-CREATE TABLE online_helpers (
+CREATE TABLE IF NOT EXISTS online_helpers (
   channel_id bigint,
   message_id bigint
-)
\ No newline at end of file
+);
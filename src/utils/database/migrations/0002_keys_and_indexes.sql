@@ -0,0 +1,76 @@
+-- primary keys, integer ids and an index for every lookup in db.py
+
+CREATE TABLE requests_new (
+  channel_id INTEGER PRIMARY KEY,
+  channel_name TEXT,
+  guild_id INTEGER,
+  user_id INTEGER,
+  t_type TEXT,
+  status TEXT,
+  bg_check INTEGER DEFAULT 0
+);
+INSERT OR REPLACE INTO requests_new(channel_id, channel_name, guild_id, user_id, t_type, status, bg_check)
+SELECT channel_id, channel_name, guild_id, CAST(user_id AS INTEGER), t_type, status, CAST(bg_check AS INTEGER)
+FROM requests WHERE channel_id IS NOT NULL;
+DROP TABLE requests;
+ALTER TABLE requests_new RENAME TO requests;
+
+CREATE TABLE archive_new (
+  channel_id INTEGER PRIMARY KEY,
+  channel_name TEXT,
+  guild_id INTEGER,
+  user_id INTEGER,
+  t_type TEXT,
+  status TEXT,
+  bg_check INTEGER DEFAULT 0
+);
+INSERT OR REPLACE INTO archive_new(channel_id, channel_name, guild_id, user_id, t_type, status, bg_check)
+SELECT channel_id, channel_name, guild_id, CAST(user_id AS INTEGER), t_type, status, CAST(bg_check AS INTEGER)
+FROM archive WHERE channel_id IS NOT NULL;
+DROP TABLE archive;
+ALTER TABLE archive_new RENAME TO archive;
+
+CREATE TABLE challenges_new (
+  id INTEGER PRIMARY KEY,
+  title TEXT,
+  author TEXT,
+  category TEXT,
+  ignore INTEGER,
+  helper_id_list TEXT
+);
+INSERT OR REPLACE INTO challenges_new(id, title, author, category, ignore, helper_id_list)
+SELECT id, title, author, category, ignore, helper_id_list
+FROM challenges WHERE id IS NOT NULL;
+DROP TABLE challenges;
+ALTER TABLE challenges_new RENAME TO challenges;
+
+CREATE TABLE helpers_new (
+  discord_id INTEGER PRIMARY KEY,
+  is_available INTEGER DEFAULT 1
+);
+INSERT OR REPLACE INTO helpers_new(discord_id, is_available)
+SELECT CAST(discord_id AS INTEGER), CAST(is_available AS INTEGER)
+FROM helpers WHERE discord_id IS NOT NULL;
+DROP TABLE helpers;
+ALTER TABLE helpers_new RENAME TO helpers;
+
+CREATE TABLE online_helpers_new (
+  message_id INTEGER PRIMARY KEY,
+  channel_id INTEGER
+);
+INSERT OR REPLACE INTO online_helpers_new(message_id, channel_id)
+SELECT message_id, channel_id
+FROM online_helpers WHERE message_id IS NOT NULL;
+DROP TABLE online_helpers;
+ALTER TABLE online_helpers_new RENAME TO online_helpers;
+
+-- get_user_open_tickets
+CREATE INDEX requests_user_type_status ON requests(user_id, t_type, status);
+-- get_all_help_channels, get_number_new
+CREATE INDEX requests_guild_type ON requests(guild_id, t_type);
+-- get_guild_safe_tickets
+CREATE INDEX requests_guild_check ON requests(guild_id, bg_check);
+-- get_number_new
+CREATE INDEX archive_guild_type ON archive(guild_id, t_type);
+-- get_helpers_from_title
+CREATE INDEX challenges_title ON challenges(title, helper_id_list);
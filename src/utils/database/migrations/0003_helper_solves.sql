@@ -0,0 +1,29 @@
+-- one row per (helper, solved challenge) instead of a json list on every challenge
+
+CREATE TABLE helper_solves (
+  helper_id INTEGER,
+  challenge_id INTEGER,
+  PRIMARY KEY (helper_id, challenge_id)
+) WITHOUT ROWID;
+-- get_helpers_for_challenge, get_helpers_from_title
+CREATE INDEX helper_solves_challenge ON helper_solves(challenge_id, helper_id);
+
+INSERT OR IGNORE INTO helper_solves(helper_id, challenge_id)
+SELECT CAST(helper.value AS INTEGER), challenges.id
+FROM challenges, json_each(challenges.helper_id_list) AS helper
+WHERE json_valid(challenges.helper_id_list);
+
+CREATE TABLE challenges_new (
+  id INTEGER PRIMARY KEY,
+  title TEXT,
+  author TEXT,
+  category TEXT,
+  ignore INTEGER
+);
+INSERT INTO challenges_new(id, title, author, category, ignore)
+SELECT id, title, author, category, ignore FROM challenges;
+DROP TABLE challenges;
+ALTER TABLE challenges_new RENAME TO challenges;
+
+-- get_helpers_from_title
+CREATE INDEX challenges_title ON challenges(title);
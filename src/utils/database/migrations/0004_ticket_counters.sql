@@ -0,0 +1,14 @@
+-- next ticket number per guild and ticket type, seeded with the number of tickets so far
+
+CREATE TABLE ticket_counters (
+  guild_id INTEGER,
+  t_type TEXT,
+  value INTEGER DEFAULT 0,
+  PRIMARY KEY (guild_id, t_type)
+) WITHOUT ROWID;
+
+INSERT INTO ticket_counters(guild_id, t_type, value)
+SELECT guild_id, t_type, count(1) FROM
+(SELECT channel_id, guild_id, t_type FROM requests
+UNION SELECT channel_id, guild_id, t_type FROM archive)
+GROUP BY guild_id, t_type;
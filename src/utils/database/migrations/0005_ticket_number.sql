@@ -0,0 +1,12 @@
+-- store the ticket number instead of parsing it back out of the channel name
+
+ALTER TABLE requests ADD COLUMN number INTEGER;
+ALTER TABLE archive ADD COLUMN number INTEGER;
+
+-- the number is everything after the last '-' of help and misc channel names
+UPDATE requests
+SET number = CAST(substr(channel_name, length(rtrim(channel_name, replace(channel_name, '-', ''))) + 1) AS INTEGER)
+WHERE t_type != 'submit';
+UPDATE archive
+SET number = CAST(substr(channel_name, length(rtrim(channel_name, replace(channel_name, '-', ''))) + 1) AS INTEGER)
+WHERE t_type != 'submit';
@@ -0,0 +1,2 @@
+-- get_autoclose_candidates
+CREATE INDEX requests_guild_status_check ON requests(guild_id, status, bg_check);
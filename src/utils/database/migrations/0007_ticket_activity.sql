@@ -0,0 +1,18 @@
+-- unix timestamps of a ticket's creation, close and latest message
+
+ALTER TABLE requests ADD COLUMN created_at REAL;
+ALTER TABLE requests ADD COLUMN closed_at REAL;
+ALTER TABLE requests ADD COLUMN last_message_at REAL;
+ALTER TABLE requests ADD COLUMN last_message_author_is_staff INTEGER DEFAULT 0;
+
+ALTER TABLE archive ADD COLUMN created_at REAL;
+ALTER TABLE archive ADD COLUMN closed_at REAL;
+ALTER TABLE archive ADD COLUMN last_message_at REAL;
+ALTER TABLE archive ADD COLUMN last_message_author_is_staff INTEGER DEFAULT 0;
+
+-- a channel id is a snowflake, so it holds the channel's creation time
+UPDATE requests
+SET created_at = ((channel_id >> 22) + 1420070400000) / 1000.0,
+last_message_at = ((channel_id >> 22) + 1420070400000) / 1000.0;
+UPDATE archive
+SET created_at = ((channel_id >> 22) + 1420070400000) / 1000.0;
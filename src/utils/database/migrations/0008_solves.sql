@@ -0,0 +1,28 @@
+-- local mirror of platform solves, synced incrementally by SolveMirror
+
+-- who a discord user solves as, team_id is NULL for solo players
+CREATE TABLE solvers (
+  discord_id INTEGER PRIMARY KEY,
+  team_id INTEGER,
+  resolved_at REAL
+);
+
+-- sync state of every solo player (is_team = 0) and team (is_team = 1)
+CREATE TABLE solve_cursors (
+  is_team INTEGER,
+  owner_id INTEGER,
+  last_solve_id INTEGER,
+  synced_at REAL,
+  full_synced_at REAL,
+  PRIMARY KEY (is_team, owner_id)
+) WITHOUT ROWID;
+
+CREATE TABLE solves (
+  is_team INTEGER,
+  owner_id INTEGER,
+  challenge_id INTEGER,
+  solve_id INTEGER,
+  PRIMARY KEY (is_team, owner_id, challenge_id)
+) WITHOUT ROWID;
+-- solvers of a challenge
+CREATE INDEX solves_challenge ON solves(challenge_id);
@@ -0,0 +1,14 @@
+-- background jobs handed from the bot to the worker process (worker.py)
+
+CREATE TABLE jobs (
+  id INTEGER PRIMARY KEY,
+  name TEXT,
+  payload TEXT,
+  status TEXT DEFAULT 'queued', -- queued, running, done, failed, cancelled
+  result TEXT,
+  created_at REAL,
+  started_at REAL,
+  finished_at REAL
+);
+-- claim_job
+CREATE INDEX jobs_status ON jobs(status, id);
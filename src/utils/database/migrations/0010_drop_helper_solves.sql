@@ -0,0 +1,13 @@
+-- helper_solves duplicated the solves mirror, helpers are marked in solvers instead
+
+ALTER TABLE solvers ADD COLUMN is_helper INTEGER DEFAULT 0;
+
+-- the copied rows answer helper lookups until UpdateHelpers syncs the helpers again,
+-- resolved_at = 0 makes that sync look up their teams and replace the rows
+INSERT INTO solvers(discord_id, team_id, resolved_at, is_helper)
+SELECT DISTINCT helper_id, NULL, 0, 1 FROM helper_solves WHERE true
+ON CONFLICT(discord_id) DO UPDATE SET is_helper = 1;
+INSERT OR IGNORE INTO solves(is_team, owner_id, challenge_id, solve_id)
+SELECT 0, helper_id, challenge_id, NULL FROM helper_solves;
+
+DROP TABLE helper_solves;
@@ -0,0 +1,71 @@
+import copy
+import threading
+from typing import Dict, Iterable, Optional
+import logging
+
+from utils.utility import Ticket
+
+log = logging.getLogger(__name__)
+
+class TicketStore():
+    """In-memory copy of the requests table keyed by channel id
+
+    It is filled once from the database with `load` and afterwards kept in sync
+    by `DatabaseManager`, which writes to sqlite first and then to the store.
+    Until it is loaded every lookup misses and falls through to the database.
+    """
+    _tickets: Dict[int, Ticket] = {}
+    _lock = threading.RLock()
+    loaded = False
+
+    @classmethod
+    def load(cls, tickets: Iterable[Ticket]) -> int:
+        """replaces the store with the given tickets
+
+        Parameters
+        ----------
+        tickets : `Iterable[Ticket]`
+            every ticket in the requests table\n
+
+        Returns
+        -------
+        `int`: number of tickets loaded
+        """
+        with cls._lock:
+            cls._tickets = {ticket.channel_id: ticket for ticket in tickets}
+            cls.loaded = True
+            return len(cls._tickets)
+
+    @classmethod
+    def get(cls, channel_id: int) -> Optional[Ticket]:
+        """gets a copy of a ticket
+
+        Parameters
+        ----------
+        channel_id : `int`
+            the channel id\n
+
+        Returns
+        -------
+        `Optional[Ticket]`: the ticket, None if the ticket isn't stored
+        """
+        with cls._lock:
+            ticket = cls._tickets.get(channel_id)
+            return copy.copy(ticket) if ticket is not None else None
+
+    @classmethod
+    def put(cls, ticket: Ticket):
+        with cls._lock:
+            cls._tickets[ticket.channel_id] = copy.copy(ticket)
+
+    @classmethod
+    def update(cls, channel_id: int, **columns):
+        with cls._lock:
+            if (ticket := cls._tickets.get(channel_id)) is not None:
+                for column, value in columns.items():
+                    setattr(ticket, column, value)
+
+    @classmethod
+    def remove(cls, channel_id: int):
+        with cls._lock:
+            cls._tickets.pop(channel_id, None)
@@ -12,3 +12,14 @@ class ChallengeDoesNotExist(Exception):
 
 class HelperSyncError(Exception):
     """Raised when a helper is missing"""
+
+class APIRequestError(Exception):
+    """Raised when a request to the CTF platform API fails"""
+    def __init__(self, path: str, status: int = None, retry_after: float = None):
+        super().__init__(f"Fetching {path} failed" + (f" with status {status}" if status else ""))
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def transient(self) -> bool:
+        return self.status is None or self.status == 429 or self.status >= 500
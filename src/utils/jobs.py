@@ -0,0 +1,90 @@
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, NamedTuple, Optional
+import asyncio
+import random
+import time
+import logging
+
+import config
+
+log = logging.getLogger(__name__)
+
+class JobRun(NamedTuple):
+    started_at: datetime
+    duration: float
+    outcome: str
+
+class JobRunner():
+    """Runs the background jobs started by the crons in `cogs/tasks.py`
+
+    A job that is triggered while it is still running isn't started again, the
+    trigger waits for the running job instead. Jobs start after a random delay
+    of up to `config.jobs['jitter']` seconds so jobs scheduled for the same
+    minute don't all start at once, and are cancelled after their timeout.
+    The last `config.jobs['history']` runs of every job are kept.
+    """
+    _running: Dict[str, asyncio.Task] = {}
+    history: Dict[str, Deque[JobRun]] = {}
+    coalesced: Counter = Counter()
+
+    @classmethod
+    async def run(cls, name: str, job: Callable[[], Awaitable[Any]],
+                  timeout: Optional[float] = None, jitter: Optional[float] = None) -> Any:
+        """runs a job, or waits for it if it's already running
+
+        Parameters
+        ----------
+        name : `str`
+            the job's name, runs with the same name are never concurrent\n
+        job : `Callable[[], Awaitable[Any]]`
+            starts the job\n
+        timeout : `Optional[float]`, optional
+            seconds before the job is cancelled, by default the job's entry in
+            `config.jobs['timeouts']` or `config.jobs['timeout']`\n
+        jitter : `Optional[float]`, optional
+            maximum start delay in seconds, by default `config.jobs['jitter']`\n
+
+        Returns
+        -------
+        `Any`: what the job returned, None if it failed or timed out
+        """
+        if (task := cls._running.get(name)) is not None and not task.done():
+            cls.coalesced[name] += 1
+            log.info(f"Job {name} is already running, waiting for it")
+            return await asyncio.shield(task)
+
+        task = asyncio.create_task(cls._run(
+            name, job, config.jobs['timeouts'].get(name, config.jobs['timeout']) if timeout is None else timeout,
+            config.jobs['jitter'] if jitter is None else jitter))
+        cls._running[name] = task
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _run(cls, name: str, job: Callable[[], Awaitable[Any]], timeout: float, jitter: float) -> Any:
+        try:
+            await asyncio.sleep(random.uniform(0, jitter))
+            started_at = datetime.now(timezone.utc)
+            start = time.monotonic()
+            result = None
+            try:
+                result = await asyncio.wait_for(job(), timeout)
+            except asyncio.TimeoutError:
+                outcome = f"timed out after {timeout:g}s"
+                log.error(f"Job {name} {outcome}")
+            except Exception as e:
+                outcome = f"failed: {type(e).__name__}: {e}"[:200]
+                log.exception(e)
+            else:
+                outcome = "ok"
+            duration = time.monotonic() - start
+            cls.history.setdefault(name, deque(maxlen=config.jobs['history'])).append(
+                JobRun(started_at, duration, outcome))
+            log.info(f"Finished job {name} in {duration:.1f}s: {outcome}")
+            return result
+        finally:
+            cls._running.pop(name, None)
+
+    @classmethod
+    def is_running(cls, name: str) -> bool:
+        return (task := cls._running.get(name)) is not None and not task.done()
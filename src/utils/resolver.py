@@ -0,0 +1,147 @@
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+import logging
+
+import discord
+from discord.utils import get
+
+import config
+
+log = logging.getLogger(__name__)
+
+Overwrites = Dict[Union[discord.Role, discord.Member], discord.PermissionOverwrite]
+
+class GuildResolver():
+    """Caches the roles, categories and channels the bot looks up by name, per guild
+
+    Found objects are kept until a role or a matching channel of the guild is
+    created, updated or deleted, see the `on_guild_role_*` and `on_guild_channel_*`
+    events in bot.py.
+    """
+    _roles: Dict[int, Dict[Hashable, Any]] = {}
+    _channels: Dict[int, Dict[Hashable, Any]] = {}
+
+    @staticmethod
+    def _cached(cache: Dict[int, Dict[Hashable, Any]], guild: discord.Guild, key: Hashable, resolve: Callable[[], Any]) -> Any:
+        entries = cache.setdefault(guild.id, {})
+        if (value := entries.get(key)) is None:
+            value = resolve()
+            if value is not None:  # misses aren't cached, the next lookup may find it
+                entries[key] = value
+        return value
+
+    @classmethod
+    def role(cls, guild: discord.Guild, role: str) -> Optional[discord.Role]:
+        """gets one of the roles in `config.roles`
+
+        Parameters
+        ----------
+        guild : `discord.Guild`
+            the guild\n
+        role : `str`
+            key of the role in `config.roles`, e.g. "admin"\n
+
+        Returns
+        -------
+        `Optional[discord.Role]`: the role, None if the guild doesn't have it
+        """
+        return cls._cached(cls._roles, guild, role, lambda: get(guild.roles, name=config.roles[role]))
+
+    @classmethod
+    def category(cls, guild: discord.Guild, name: str) -> Optional[discord.CategoryChannel]:
+        return cls._cached(cls._channels, guild, ("category", name), lambda: get(guild.categories, name=name))
+
+    @classmethod
+    def text_channel(cls, guild: discord.Guild, name: str,
+                     category: Optional[discord.CategoryChannel] = None) -> Optional[discord.TextChannel]:
+        """gets a text channel by name
+
+        Parameters
+        ----------
+        guild : `discord.Guild`
+            the guild\n
+        name : `str`
+            the channel's name\n
+        category : `Optional[discord.CategoryChannel]`, optional
+            only look in this category, by default anywhere\n
+
+        Returns
+        -------
+        `Optional[discord.TextChannel]`: the channel, None if it doesn't exist
+        """
+        if category is None:
+            return cls._cached(cls._channels, guild, ("text", name, None),
+                               lambda: get(guild.text_channels, name=name))
+        return cls._cached(cls._channels, guild, ("text", name, category.id),
+                           lambda: get(guild.text_channels, category=category, name=name))
+
+    @classmethod
+    def log_channel(cls, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        return cls.text_channel(guild, config.logs['name'])
+
+    @classmethod
+    def ticket_overwrites(cls, guild: discord.Guild, member: Optional[discord.Member]) -> Overwrites:
+        """gets the permission overwrites of a new ticket
+
+        Parameters
+        ----------
+        guild : `discord.Guild`
+            the guild\n
+        member : `Optional[discord.Member]`
+            the ticket's owner\n
+
+        Returns
+        -------
+        `Overwrites`: the overwrites
+        """
+        def template() -> Overwrites:
+            return {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                cls.role(guild, 'admin'): discord.PermissionOverwrite(
+                    read_messages=True),
+                cls.role(guild, 'bot'): discord.PermissionOverwrite(read_messages=True),
+                cls.role(guild, 'muted'): discord.PermissionOverwrite(
+                    create_instant_invite=False, send_messages=False),
+                cls.role(guild, 'quarantine'): discord.PermissionOverwrite(
+                    view_channel=False, create_instant_invite=False, send_messages=False)
+            }
+
+        overwrites = dict(cls._cached(cls._roles, guild, "ticket overwrites", template))
+        overwrites[member] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
+        return overwrites
+
+    @classmethod
+    def roles_changed(cls, guild: discord.Guild):
+        cls._roles.pop(guild.id, None)
+
+    @classmethod
+    def channel_changed(cls, channel: discord.abc.GuildChannel, before: Optional[discord.abc.GuildChannel] = None):
+        """forgets the guild's channel lookups if they could have been affected by a channel event
+
+        Ticket channels are created, renamed and moved all the time, those only
+        matter when they share a name with a channel that was looked up.
+
+        Parameters
+        ----------
+        channel : `discord.abc.GuildChannel`
+            the channel\n
+        before : `Optional[discord.abc.GuildChannel]`, optional
+            the channel before an update\n
+        """
+        entries = cls._channels.get(channel.guild.id)
+        if not entries:
+            return
+        names = {key[1] for key in entries}
+        if (isinstance(channel, discord.CategoryChannel) or channel.name in names
+                or (before is not None and before.name in names)):
+            del cls._channels[channel.guild.id]
+            log.debug(f"Forgot channel lookups of {channel.guild}")
+
+    @classmethod
+    def guild_removed(cls, guild: discord.Guild):
+        cls._roles.pop(guild.id, None)
+        cls._channels.pop(guild.id, None)
+
+    @classmethod
+    def clear(cls):
+        cls._roles.clear()
+        cls._channels.clear()
@@ -1,13 +1,14 @@
 import io
 import random
-from typing import NamedTuple, Tuple, Union
+from typing import List, Mapping, NamedTuple, Optional, Tuple, Union
 import logging
 
 import discord
 from discord.ext import commands
 import chat_exporter
 
-import config
+from utils import types
+from utils.resolver import GuildResolver
 
 log = logging.getLogger(__name__)
 
@@ -57,8 +58,7 @@ class UI:
         else:
             log_embed = cls.log_embed(
                 title, channel_name, **kwargs)
-        log_channel = discord.utils.get(
-            channel_name.guild.text_channels, name=config.logs['name'])
+        log_channel = GuildResolver.log_channel(channel_name.guild)
         await log_channel.send(embed=log_embed)
 
     @staticmethod
@@ -85,7 +85,8 @@ class Utility:
     """Abstract helper methods"""
 
     @staticmethod
-    async def transcript(channel: discord.TextChannel, destination: Union[discord.User, discord.TextChannel]) -> Tuple[discord.Message, discord.File]:
+    async def transcript(channel: discord.TextChannel, destination: Union[discord.User, discord.TextChannel],
+                         messages: Optional[List[discord.Message]] = None) -> Tuple[discord.Message, discord.File]:
         """send a transcript of a channel to a user or a channel
 
         Parameters
@@ -94,12 +95,17 @@ class Utility:
             channel to get transcirpt of\n
         destination : `Union[discord.User, discord.TextChannel]`
             place to send transcript to\n
+        messages : `Optional[List[discord.Message]]`, optional
+            the channel's messages, newest first, by default the whole history is fetched\n
 
         Returns
         -------
         `Tuple[discord.Message, discord.File]`: The message with the transcript sent as reference to the transcript
         """
-        transcript = await chat_exporter.export(channel, None, "America/Los_Angeles")
+        if messages is None:
+            transcript = await chat_exporter.export(channel, None, "America/Los_Angeles")
+        else:  # raw_export reverses the list in place
+            transcript = await chat_exporter.raw_export(channel, list(messages), "America/Los_Angeles")
         if transcript is None:
             return
 
@@ -155,7 +161,7 @@ class Utility:
 
     @staticmethod
     async def random_admin_member(guild) -> discord.Member:
-        role = discord.utils.get(guild.roles, name=config.roles['admin'])
+        role = GuildResolver.role(guild, 'admin')
         person = random.choice(role.members)
         return person
 
@@ -165,7 +171,58 @@ class Challenge(NamedTuple):
     author: str
     category: str
     ignore: bool = False
-    helper_id_list: str = str([])
 
     def __repr__(self):
         return f"{self.title}({self.id}, {self.author}, {self.category}, {self.ignore})"
+
+class ChallengeRefresh(NamedTuple):
+    added: List[int]
+    updated: List[int]
+    removed: List[int]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    def __repr__(self):
+        return f"{len(self.added)} added, {len(self.updated)} updated, {len(self.removed)} removed"
+
+class AutoCloseSummary(NamedTuple):
+    checked: int
+    warned: int
+    closed: int
+    failed: int
+    duration: float
+
+    def __repr__(self):
+        return (f"{self.checked} checked, {self.warned} warned, {self.closed} closed, "
+                f"{self.failed} failed in {self.duration:.1f}s")
+
+class Ticket:
+    """A single ticket, one row of the requests table"""
+    __slots__ = ('channel_id', 'channel_name', 'guild_id', 'user_id',
+                 't_type', 'status', 'bg_check', 'number', 'created_at',
+                 'closed_at', 'last_message_at', 'last_message_author_is_staff')
+
+    def __init__(self, channel_id: int, channel_name: str, guild_id: int, user_id: int, t_type: types.TicketType,
+                 status: types.TicketStatus, bg_check: int, number: Optional[int] = None, created_at: Optional[float] = None,
+                 closed_at: Optional[float] = None, last_message_at: Optional[float] = None, last_message_author_is_staff: int = 0):
+        self.channel_id = channel_id
+        self.channel_name = channel_name
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.t_type = t_type
+        self.status = status
+        self.bg_check = bg_check
+        self.number = number
+        self.created_at = created_at
+        self.closed_at = closed_at
+        self.last_message_at = last_message_at
+        self.last_message_author_is_staff = last_message_author_is_staff
+
+    @classmethod
+    def from_row(cls, row: Mapping) -> "Ticket":
+        return cls(**{column: row[column] for column in cls.__slots__})
+
+    def __repr__(self):
+        return f"Ticket({self.channel_name}, {self.channel_id}, {self.status}, {self.bg_check})"
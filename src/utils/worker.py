@@ -0,0 +1,179 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import asyncio
+import json
+import time
+import logging
+
+from discord.ext import commands
+
+from utils import exceptions
+from utils.api import APIClient
+from utils.background import ScrapeChallenges, UpdateHelpers
+from utils.jobs import JobRunner
+from utils.database.db import DatabaseManager as db
+from utils.database.async_db import AsyncDatabaseManager as adb
+import config
+
+log = logging.getLogger(__name__)
+
+Mutation = Dict[str, Any]
+
+class Worker():
+    """Runs the jobs queued in the `jobs` table, in a process of its own (`worker.py`)
+
+    Jobs only touch the database and the CTF platform api. Everything the bot
+    has to do afterwards is returned as a list of mutations, see `WorkerClient.apply`.
+    """
+
+    @staticmethod
+    async def scrape_challenges(payload: Dict[str, Any]) -> List[Mutation]:
+        refresh = await ScrapeChallenges.refresh(payload.get('force', False))
+        mutations = []
+        if refresh.changed:
+            mutations.append({"type": "invalidate_solves"})
+        if refresh.added:
+            mutations.append({"type": "run", "job": "UpdateHelpers"})
+        return mutations
+
+    @staticmethod
+    async def update_helpers(payload: Dict[str, Any]) -> List[Mutation]:
+        try:
+            await UpdateHelpers.store_solves(payload['helper_ids'])
+        except exceptions.ChallengeDoesNotExist:
+            return [{"type": "invalidate_solves"}, {"type": "run", "job": "ScrapeChallenges"}]
+        return [{"type": "invalidate_solves"}]
+
+    @classmethod
+    def handler(cls, name: str) -> Callable[[Dict[str, Any]], Awaitable[List[Mutation]]]:
+        return {"ScrapeChallenges": cls.scrape_challenges,
+                "UpdateHelpers": cls.update_helpers}[name]
+
+    @classmethod
+    async def main(cls):
+        """claims and runs queued jobs until cancelled"""
+        if (n_failed := await adb.fail_running_jobs()):
+            log.warning(f"Failed {n_failed} jobs left running by the previous worker")
+        cleaned_at = 0.0
+        try:
+            while True:
+                if time.time() - cleaned_at > 60 * 60:
+                    cleaned_at = time.time()
+                    await adb.delete_finished_jobs(cleaned_at - config.worker['keep_days'] * 24 * 60 * 60)
+
+                job = await adb.claim_job()
+                if job is None:
+                    await asyncio.sleep(config.worker['poll_interval'])
+                    continue
+                await cls.run_job(job['id'], job['name'], json.loads(job['payload'] or '{}'))
+        finally:
+            await APIClient.close()
+            adb.shutdown()
+            db.close()
+
+    @classmethod
+    async def run_job(cls, job_id: int, name: str, payload: Dict[str, Any]):
+        start = time.monotonic()
+        try:
+            mutations = await cls.handler(name)(payload)
+        except Exception as e:
+            log.exception(e)
+            await adb.finish_job(job_id, 'failed', json.dumps({"error": f"{type(e).__name__}: {e}"}))
+            return
+        await adb.finish_job(job_id, 'done', json.dumps({"mutations": mutations}))
+        log.info(f"Finished job {name} ({job_id}) in {time.monotonic() - start:.1f}s, {len(mutations)} mutations")
+
+class WorkerClient():
+    """Runs background jobs from the bot, in the worker process if `config.worker['enabled']`
+
+    Jobs are handed over through the `jobs` table, the bot waits for the
+    result and applies the mutations the worker sent back.
+    """
+    _followups: Set[asyncio.Task] = set()
+
+    @classmethod
+    async def run_job(cls, bot: commands.Bot, name: str, force: bool = False) -> Any:
+        """runs a background job
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        name : `str`
+            "ScrapeChallenges" or "UpdateHelpers"\n
+        force : `bool`, optional
+            refresh the challenges even if they didn't change, by default False\n
+
+        Returns
+        -------
+        `Any`: the job's result
+        """
+        if name == "ScrapeChallenges":
+            if not config.worker['enabled']:
+                return await ScrapeChallenges.main(bot, force)
+            return await cls.submit(bot, name, {"force": force})
+        if name == "UpdateHelpers":
+            if not config.worker['enabled']:
+                try:
+                    return await UpdateHelpers.main(bot)
+                except exceptions.ChallengeDoesNotExist:
+                    return await JobRunner.run("ScrapeChallenges", lambda: cls.run_job(bot, "ScrapeChallenges"), jitter=0)
+            return await cls.submit(bot, name, {"helper_ids": sorted(UpdateHelpers.helper_ids(bot))})
+        raise ValueError(f"Unknown job {name}")
+
+    @classmethod
+    async def submit(cls, bot: commands.Bot, name: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """queues a job for the worker, waits for it and applies its mutations
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        name : `str`
+            the job\n
+        payload : `Dict[str, Any]`
+            json arguments of the job\n
+
+        Returns
+        -------
+        `Optional[Dict[str, Any]]`: the job's result, None if it didn't finish
+        """
+        job_id = await adb.create_job(name, json.dumps(payload))
+        try:
+            while (job := await adb.get_job(job_id)) is not None and job['status'] in ('queued', 'running'):
+                await asyncio.sleep(config.worker['poll_interval'])
+        except asyncio.CancelledError:
+            await adb.cancel_job(job_id)
+            raise
+        if job is None:
+            return None
+        result = json.loads(job['result'] or '{}')
+        if job['status'] != 'done':
+            log.error(f"Worker job {name} ({job_id}) {job['status']}: {result.get('error')}")
+            return result
+        cls.apply(bot, result.get('mutations', []))
+        return result
+
+    @classmethod
+    def apply(cls, bot: commands.Bot, mutations: List[Mutation]):
+        """applies the mutations a worker job sent back
+
+        `invalidate_solves` clears the cached solve lists, `run` starts another
+        job (without waiting for it).
+
+        Parameters
+        ----------
+        bot : `commands.Bot`
+            the bot\n
+        mutations : `List[Mutation]`
+            the mutations\n
+        """
+        for mutation in mutations:
+            if mutation['type'] == "invalidate_solves":
+                ScrapeChallenges.solve_cache.invalidate()
+            elif mutation['type'] == "run":
+                name = mutation['job']
+                task = asyncio.create_task(JobRunner.run(name, lambda name=name: cls.run_job(bot, name), jitter=0))
+                cls._followups.add(task)
+                task.add_done_callback(cls._followups.discard)
+            else:
+                log.warning(f"Unknown mutation {mutation}")
@@ -0,0 +1,26 @@
+import asyncio
+import logging
+
+from utils.logging_setup import start_logging
+
+start_logging('worker.log')
+
+import config
+from utils.database.migrate import MigrationManager
+from utils.worker import Worker
+
+log = logging.getLogger()
+
+def run_worker():
+    if not config.worker['enabled']:
+        log.info("config.worker['enabled'] is off, the bot runs its jobs itself")
+        return
+    MigrationManager.run()
+    log.info("worker has started")
+    try:
+        asyncio.run(Worker.main())
+    except KeyboardInterrupt:
+        log.info("worker has stopped")
+
+
+run_worker()